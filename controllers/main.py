@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import tempfile
+
+from odoo import api, http
+from odoo.http import request, content_disposition
+from odoo.modules.registry import Registry
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class PeeplWeeklyReportExport(http.Controller):
+
+    @http.route('/peepl_weekly_report/export/<string:file_format>', type='http', auth='user', methods=['GET'])
+    def export_reports(self, file_format, dept_id=None, **kwargs):
+        """Stream weekly reports (with department custom fields) as CSV or XLSX"""
+        if file_format not in ('csv', 'xlsx'):
+            raise request.not_found()
+        dept_id = int(dept_id) if dept_id else False
+        # Rows are produced after this request's cursor is closed: use a dedicated one
+        dbname, uid, context = request.db, request.env.uid, dict(request.env.context)
+
+        def rows():
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from env['peepl.weekly.report']._export_rows(dept_id, EXPORT_CHUNK_SIZE)
+
+        if file_format == 'csv':
+            body, mimetype = self._stream_csv(rows()), 'text/csv;charset=utf-8'
+        else:
+            body, mimetype = self._stream_xlsx(rows()), 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return request.make_response(body, headers=[
+            ('Content-Type', mimetype),
+            ('Content-Disposition', content_disposition(f'weekly_reports.{file_format}')),
+        ])
+
+    def _stream_csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    def _stream_xlsx(self, rows):
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk: memory stays flat, the file is streamed back
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+            worksheet = workbook.add_worksheet('Weekly Reports')
+            for row_index, row in enumerate(rows):
+                worksheet.write_row(row_index, 0, row)
+            workbook.close()
+            output.seek(0)
+            while chunk := output.read(64 * 1024):
+                yield chunk
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from . import peepl_field_template
+from . import peepl_facet_mixin
 from . import peepl_weekly_report
 from . import peepl_weekly_report_bod
 from . import peepl_weekly_report_department
@@ -8,6 +9,7 @@ from . import hr_department
 from . import peepl_department_view
 from . import peepl_user_assignment
 from . import peepl_pic_overview
+from . import peepl_pic_overview_snapshot
 from . import res_users
 from . import peepl_department_delete_wizard
 from . import peepl_division
\ No newline at end of file
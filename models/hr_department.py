@@ -21,6 +21,18 @@ class HrDepartment(models.Model):
         string='User Assignments'
     )
 
+    # Custom report fields of the department (field_storage_mode = jsonb), synced from templates
+    weekly_report_properties_definition = fields.PropertiesDefinition(
+        string='Weekly Report Custom Fields'
+    )
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'name' in vals:
+            # Department names are labels of the cached facets
+            self.env['peepl.weekly.report']._bump_facet_version()
+        return result
+
     @api.depends('weekly_report_ids')
     def _compute_weekly_report_count(self):
         for dept in self:
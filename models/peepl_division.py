@@ -15,14 +15,12 @@ class PeeplDivision(models.Model):
 
     @api.depends_context('uid')
     def _compute_allowed_departments(self):
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            departments = self.env['hr.department'].sudo().search([])
+        elif profile.is_supervisor or profile.is_manager:
+            departments = self.env['hr.department'].browse(profile.department_id)
+        else:
+            departments = self.env['hr.department']
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                record.allowed_department_ids = self.env['hr.department'].sudo().search([])
-            elif current_user.has_group('peepl_weekly_report.group_peepl_supervisor') or current_user.has_group('peepl_weekly_report.group_peepl_manager'):
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id), ('active', '=', True)
-                ], limit=1)
-                record.allowed_department_ids = user_assignment.department_id if user_assignment else self.env['hr.department']
-            else:
-                record.allowed_department_ids = self.env['hr.department']
+            record.allowed_department_ids = departments
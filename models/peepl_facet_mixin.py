@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api, tools
+
+FACET_VERSION_SEQUENCE = 'peepl_facet_version_seq'
+FACET_VERSION_BUMPED_KEY = 'peepl.facet.version.bumped'
+
+
+class PeeplFacetMixin(models.AbstractModel):
+    """Mixin serving the distinct values of fields for filter dropdowns"""
+    _name = 'peepl.facet.mixin'
+    _description = 'Facet Mixin'
+
+    @api.model
+    def get_facets(self, field_names, domain=None):
+        """Return {fname: [{'value', 'label', 'count'}]} of the records visible to the user.
+
+        Values come from one ``read_group`` per field, scoped by the record
+        rules. Results are cached per access profile, language and data
+        version, so repeated calls (paging, sorting, debounced searches) cost
+        a single sequence read until the data or the user's scope changes.
+        """
+        domain = domain or []
+        return self._get_facets_cached(
+            tuple(field_names), domain, repr(domain), self._get_facet_profile_key(),
+            self.env.lang or 'en_US', self._get_facet_version())
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {FACET_VERSION_SEQUENCE}")
+
+    @api.model
+    def _get_facet_profile_key(self):
+        """Return what the record rules of the facet models depend on.
+
+        Assignment changes clear the registry cache, which covers the rules
+        following the assignments of other users.
+        """
+        if self.env['peepl.user.assignment']._get_access_profile().is_bod:
+            return 'bod'
+        user = self.env.user
+        return (user.id, tuple(user.weekly_report_department_ids.ids), tuple(user.weekly_report_division_ids.ids))
+
+    @api.model
+    def _get_facet_version(self):
+        """Return the data version of the cached facets (see ``_bump_facet_version``)"""
+        self.env.cr.execute(f"SELECT last_value FROM {FACET_VERSION_SEQUENCE}")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _bump_facet_version(self):
+        """Invalidate the cached facets of all users.
+
+        Call it when a faceted value changes. The sequence is not
+        transactional: it is bumped now for the readers of this transaction,
+        and once more right before commit so that concurrent readers caching
+        the old data in between do not keep it.
+        """
+        self.env.cr.execute(f"SELECT nextval('{FACET_VERSION_SEQUENCE}')")
+        if not self.env.cr.precommit.data.get(FACET_VERSION_BUMPED_KEY):
+            self.env.cr.precommit.data[FACET_VERSION_BUMPED_KEY] = True
+            cr = self.env.cr
+
+            @cr.precommit.add
+            def bump_before_commit():
+                cr.execute(f"SELECT nextval('{FACET_VERSION_SEQUENCE}')")
+
+    @api.model
+    @tools.ormcache('self._name', 'field_names', 'domain_key', 'profile_key', 'lang', 'version')
+    def _get_facets_cached(self, field_names, domain, domain_key, profile_key, lang, version):
+        facets = {}
+        for fname in field_names:
+            field = self._fields[fname]
+            selection = dict(field._description_selection(self.env)) if field.type == 'selection' else {}
+            values = []
+            for value, count in self._read_group(domain, [fname], ['__count']):
+                if field.type == 'many2one':
+                    if not value:
+                        continue
+                    values.append({'value': value.id, 'label': value.display_name, 'count': count})
+                elif value not in (False, None):
+                    values.append({'value': value, 'label': selection.get(value, str(value)), 'count': count})
+            facets[fname] = sorted(values, key=lambda facet: facet['label'].lower())
+        return facets
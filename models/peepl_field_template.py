@@ -1,8 +1,23 @@
 # -*- coding: utf-8 -*-
+import json
+import re
+from collections import defaultdict
+
 from lxml.builder import E
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.tools import make_index_name, create_index
 
+# Template fields whose change requires the column definition to be synced
+SYNC_FIELDS = ['name', 'field_type', 'selection_values', 'relation_model', 'active']
+# Same for the property definitions of the ``jsonb`` storage mode
+PROPERTY_SYNC_FIELDS = SYNC_FIELDS + ['sequence', 'department_id']
+# Template fields shown in patched views and labels: changing them bumps the template version
+VIEW_FIELDS = PROPERTY_SYNC_FIELDS + ['anchor_field', 'position']
+
+# Properties field holding template values in the ``jsonb`` storage mode
+PROPERTIES_FIELD = 'custom_properties'
+TEMPLATE_FNAME_RE = re.compile(r'^x_field\d+_value$')
+
 
 class PeeplFieldTemplate(models.Model):
     """Field templates for weekly reports - similar to survey.template"""
@@ -48,91 +63,217 @@ class PeeplFieldTemplate(models.Model):
             domain.append(('model', '=', model))
         return self.env['ir.model.fields'].sudo().search(domain)
 
+    @api.model
+    def _get_storage_mode(self):
+        """Return where template values are stored.
+
+        ``column`` (default) adds one ``x_field{id}_value`` column per
+        template; ``jsonb`` keeps all values of a report in the
+        ``custom_properties`` JSONB column, defined per department, so
+        templates need no schema change.
+        """
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'peepl_weekly_report.field_storage_mode', 'column')
+
     def _sync_all_template_columns(self):
         """Sync fields on all models inheriting peepl.field.template.mixin"""
+        if self._get_storage_mode() == 'jsonb':
+            self._sync_template_properties()
+            return
         # Direct sync to weekly report model
         self._sync_template_column('peepl.weekly.report')
 
+    def _prepare_property_definition(self):
+        """Return the property definition of this template"""
+        self.ensure_one()
+        definition = {
+            'name': self._column_name(),
+            'string': self.name,
+            'type': self.field_type,
+        }
+        if self.field_type == 'selection':
+            options = [line.strip() for line in (self.selection_values or '').split('\n') if line.strip()]
+            definition['selection'] = [[opt, opt] for opt in options]
+        return definition
+
+    def _sync_template_properties(self, departments=None):
+        """Rebuild the property definitions of the departments of these templates"""
+        if departments is None:
+            departments = self.with_context(active_test=False).mapped('department_id')
+        templates = self.search([('department_id', 'in', departments.ids), ('active', '=', True)])
+        templates_by_department = templates.grouped('department_id')
+        for department in departments.sudo():
+            department.weekly_report_properties_definition = [
+                template._prepare_property_definition()
+                for template in templates_by_department.get(department, self.browse())
+            ]
+
+    def _prepare_column_vals(self, model, model_id):
+        """Return the ir.model.fields values of this template's field on ``model``"""
+        self.ensure_one()
+        field_data = {
+            'name': self._column_name(),
+            'field_description': self.name,
+            'state': 'manual',
+            'model': model,
+            'model_id': model_id,
+            'ttype': self.field_type,
+            'copied': True,
+        }
+
+        # Add selection values
+        if self.field_type == 'selection' and self.selection_values:
+            options = [line.strip() for line in self.selection_values.split('\n') if line.strip()]
+            field_data['selection'] = str([(opt, opt) for opt in options])
+        
+        # Add relation model
+        if self.field_type == 'many2one' and self.relation_model:
+            field_data['relation'] = self.relation_model
+        return field_data
+
     def _sync_template_column(self, model):
-        """Create/update field on a specific model for this template"""
+        """Create/update the fields of all templates in self on a specific model.
+
+        ``ir.model.fields`` sets the registry up again on every create, write
+        and unlink of manual fields, so the changes are batched: one unlink,
+        one create and one write per distinct change.
+        """
+        IrFields = self.env['ir.model.fields'].sudo()
+        model_id = self.env['ir.model']._get_id(model)
+        existing_fields = {
+            field.name: field
+            for field in self._find_template_column(model)
+        }
+        to_remove = IrFields
+        to_create = []
+        to_write = defaultdict(lambda: IrFields)
         for template in self:
-            column = template._column_name()
-            
-            # Check if field exists
-            existing_field = self.env['ir.model.fields'].sudo().search([
-                ('name', '=', column),
-                ('model', '=', model)
-            ], limit=1)
+            field_data = template._prepare_column_vals(model, model_id)
+            existing_field = existing_fields.get(field_data['name'])
 
             # If field exists and type changed, delete it first
             if existing_field and existing_field.ttype != template.field_type:
-                existing_field.sudo().unlink()
+                to_remove |= existing_field
                 existing_field = False
-            
-            field_data = {
-                'name': column,
-                'field_description': template.name,
-                'state': 'manual',
-                'model': model,
-                'model_id': self.env['ir.model']._get_id(model),
-                'ttype': template.field_type,
-                'copied': True,
+
+            if not existing_field:
+                to_create.append(field_data)
+                continue
+            changes = {
+                key: field_data[key]
+                for key in ('field_description', 'selection')
+                if key in field_data and existing_field[key] != field_data[key]
             }
+            if changes:
+                to_write[tuple(sorted(changes.items()))] |= existing_field
 
-            # Add selection values
-            if template.field_type == 'selection' and template.selection_values:
-                options = [line.strip() for line in template.selection_values.split('\n') if line.strip()]
-                field_data['selection'] = str([(opt, opt) for opt in options])
-            
-            # Add relation model
-            if template.field_type == 'many2one' and template.relation_model:
-                field_data['relation'] = template.relation_model
+        if to_remove:
+            to_remove.unlink()
+        for changes, ir_fields in to_write.items():
+            ir_fields.write(dict(changes))
+        if to_create:
+            IrFields.create(to_create)
 
-            if not existing_field:
-                # Create new field
-                field = self.env['ir.model.fields'].with_context(
-                    update_custom_fields=True
-                ).sudo().create(field_data)
-                
-                # Create index if model has _auto
-                Model = self.env[model]
-                if Model._auto:
-                    tablename = Model._table
-                    indexname = make_index_name(tablename, column)
-                    try:
-                        create_index(self.env.cr, indexname, tablename, [column], 'btree', f'{column} IS NOT NULL')
-                        field['index'] = True
-                    except Exception:
-                        pass
-            else:
-                # Update existing field
-                existing_field.write(field_data)
+    @api.model
+    def _index_template_columns(self, model):
+        """Index the filled values of the template columns of ``model``: they are mostly empty"""
+        Model = self.env[model]
+        if not Model._auto:
+            return
+        tablename = Model._table
+        self.env.cr.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [tablename])
+        existing = {indexname for indexname, in self.env.cr.fetchall()}
+        for column in Model._fields:
+            indexname = make_index_name(tablename, column)
+            if TEMPLATE_FNAME_RE.match(column) and indexname not in existing:
+                create_index(self.env.cr, indexname, tablename, [column], 'btree', f'{column} IS NOT NULL')
+
+    @api.model
+    def _get_template_version(self):
+        """Return the version of the template set, part of the view cache keys"""
+        return self.env['ir.config_parameter'].sudo().get_param('peepl_weekly_report.template_version', '0')
+
+    @api.model
+    def _bump_template_version(self):
+        """Invalidate the patched views and labels of every worker"""
+        if self.env.context.get('defer_template_reload'):
+            return
+        self.env['ir.config_parameter'].sudo().set_param(
+            'peepl_weekly_report.template_version', str(int(self._get_template_version()) + 1))
+
+    @api.model
+    def _reload_template_models(self):
+        """Finish a batch of template changes, unless a batch defers it.
+
+        ``ir.model.fields`` already set the models up and created the
+        columns; what is left is indexing the new columns.
+        """
+        if self.env.context.get('defer_template_reload'):
+            return
+        if self._get_storage_mode() == 'jsonb':
+            # Property definitions are plain data: nothing to reload
+            return
+        self.env.registry.clear_cache('stable')
+        self._index_template_columns('peepl.weekly.report')
+
+    @api.model
+    def _apply_template_changes(self, to_create=(), to_write=(), to_unlink=()):
+        """Apply several template additions, changes and deletions at once.
+
+        ``to_create`` is a list of values, ``to_write`` a list of
+        ``(template_id, values)`` and ``to_unlink`` a list of template ids.
+        Columns are synced in batch and the models are reloaded once.
+        """
+        Template = self.with_context(defer_template_reload=True)
+        jsonb = self._get_storage_mode() == 'jsonb'
+        sync_fields = PROPERTY_SYNC_FIELDS if jsonb else SYNC_FIELDS
+        removed = Template.browse(list(to_unlink)).exists()
+        departments = removed.mapped('department_id')
+        if removed:
+            removed.unlink()
+        to_sync = Template.browse()
+        for template_id, vals in to_write:
+            template = Template.browse(template_id)
+            departments |= template.department_id
+            template.write(vals)
+            if any(key in vals for key in sync_fields):
+                to_sync |= template
+        created = Template.create(list(to_create)) if to_create else Template.browse()
+        if jsonb:
+            Template._sync_template_properties(departments | created.mapped('department_id') | to_sync.mapped('department_id'))
+        else:
+            (to_sync | created).exists()._sync_all_template_columns()
+        self._reload_template_models()
+        self._bump_template_version()
+        return created.ids
 
     def write(self, vals):
         """Trigger field sync when template is modified"""
+        if any(key in vals for key in VIEW_FIELDS):
+            self._bump_template_version()
+        if self._get_storage_mode() == 'jsonb':
+            # The previous department loses the property when a template moves
+            previous_departments = self.mapped('department_id')
+            res = super().write(vals)
+            if any(key in vals for key in PROPERTY_SYNC_FIELDS) and not self.env.context.get('defer_template_reload'):
+                self._sync_template_properties(previous_departments | self.mapped('department_id'))
+            return res
         res = super().write(vals)
-        if any(key in vals for key in ['name', 'field_type', 'selection_values', 'relation_model', 'active']):
-            try:
-                self._sync_all_template_columns()
-                self.env.registry.clear_cache('stable')
-                self.env.registry.init_models(self.env.cr, ['peepl.weekly.report'], self.env.context)
-            except Exception:
-                # Skip sync during upgrade/install to avoid conflicts
-                pass
+        if any(key in vals for key in SYNC_FIELDS) and not self.env.context.get('defer_template_reload'):
+            self._sync_all_template_columns()
+            self._reload_template_models()
         return res
 
     def unlink(self):
         """Remove dynamic fields when template is deleted"""
-        try:
-            self._find_template_column().unlink()
-        except Exception:
-            pass
+        departments = self.mapped('department_id')
+        # One unlink for all the fields: the registry is set up once
+        self._find_template_column().unlink()
         res = super().unlink()
-        try:
-            self.env.registry.clear_cache('stable')
-            self.env.registry.init_models(self.env.cr, ['peepl.weekly.report'], self.env.context)
-        except Exception:
-            pass
+        if self._get_storage_mode() == 'jsonb' and not self.env.context.get('defer_template_reload'):
+            self.browse()._sync_template_properties(departments)
+        self._reload_template_models()
+        self._bump_template_version()
         # Add delay notification before reload
         return {
             'type': 'ir.actions.client',
@@ -147,17 +288,15 @@ class PeeplFieldTemplate(models.Model):
             }
         }
 
-    @api.model
-    def create(self, vals):
-        """Trigger field sync when new template is created"""
-        record = super().create(vals)
-        try:
-            record._sync_all_template_columns()
-            self.env.registry.clear_cache('stable')
-            self.env.registry.init_models(self.env.cr, ['peepl.weekly.report'], self.env.context)
-        except Exception:
-            pass
-        return record
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Trigger field sync when new templates are created"""
+        records = super().create(vals_list)
+        if not self.env.context.get('defer_template_reload'):
+            records._sync_all_template_columns()
+            self._reload_template_models()
+            self._bump_template_version()
+        return records
     
     def action_refresh_page(self):
         """Return action to reload the page"""
@@ -169,21 +308,15 @@ class PeeplFieldTemplate(models.Model):
     @api.depends('create_uid')
     def _compute_allowed_departments(self):
         """Compute allowed departments based on user role"""
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            # BOD: all departments
+            departments = self.env['hr.department'].search([])
+        else:
+            # Manager/Staff: only their department
+            departments = self.env['hr.department'].browse(profile.department_id)
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                # BOD: all departments
-                record.allowed_department_ids = self.env['hr.department'].search([])
-            else:
-                # Manager/Staff: only their department
-                assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                if assignment and assignment.department_id:
-                    record.allowed_department_ids = assignment.department_id
-                else:
-                    record.allowed_department_ids = self.env['hr.department']
+            record.allowed_department_ids = departments
 
 
 class PeeplFieldTemplateMixin(models.AbstractModel):
@@ -193,6 +326,10 @@ class PeeplFieldTemplateMixin(models.AbstractModel):
 
     def _get_template_fnames(self):
         """Get field template names filtered by department context"""
+        return list(self._get_template_fname_map())
+
+    def _get_template_fname_map(self):
+        """Return {fname: template_id} of the templates visible in the department context"""
         domain = [('active', '=', True)]
         
         # Check for department filter - BOD acts as manager of clicked department
@@ -201,43 +338,176 @@ class PeeplFieldTemplateMixin(models.AbstractModel):
             domain.append(('department_id', '=', dept_filter))
         else:
             # Regular role-based filtering
-            current_user = self.env.user
-            if not current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                if assignment and assignment.department_id:
-                    domain.append(('department_id', '=', assignment.department_id.id))
+            profile = self.env['peepl.user.assignment']._get_access_profile()
+            if not profile.is_bod and profile.department_id:
+                domain.append(('department_id', '=', profile.department_id))
             # BOD without dept_filter sees all templates (normal behavior)
         
         templates = self.env['peepl.field.template'].search(domain)
-        return [fname for template in templates if (fname := template._column_name()) in self]
+        return {
+            fname: template.id
+            for template in templates
+            if self._is_template_fname((fname := template._column_name()))
+        }
 
     def _get_field_responses(self):
         """Return dict of template_id: response for this record"""
+        self.ensure_one()
+        return self._get_field_responses_bulk().get(self.id, {})
+
+    def _get_field_responses_bulk(self):
+        """Return {record_id: {template_id: response}} for all records in self.
+
+        Templates are looked up once and values come from a single read,
+        whatever the number of records.
+        """
+        fname_map = self._get_template_fname_map()
+        read_fields = self._get_template_read_fields(list(fname_map))
+        if not self or not read_fields:
+            return {record_id: {} for record_id in self.ids}
         result = {}
-        for fname in self._get_template_fnames():
-            if self[fname]:
-                template_id = int(fname.split('field')[1].split('_')[0])
-                result[template_id] = self[fname]
+        for values in self.read(read_fields):
+            self._flatten_template_values(values)
+            result[values['id']] = {
+                template_id: values[fname]
+                for fname, template_id in fname_map.items()
+                if values.get(fname)
+            }
         return result
 
+    @api.model
+    def _uses_template_properties(self):
+        """Whether template values live in the properties field (jsonb storage mode)"""
+        return PROPERTIES_FIELD in self._fields and self.env['peepl.field.template']._get_storage_mode() == 'jsonb'
+
+    @api.model
+    def _is_template_fname(self, fname):
+        """Whether ``fname`` is a template value readable on this model"""
+        if fname in self._fields:
+            return True
+        return bool(TEMPLATE_FNAME_RE.match(fname)) and self._uses_template_properties()
+
+    @api.model
+    def _get_template_read_fields(self, fnames):
+        """Return the fields to read to get the template values ``fnames``"""
+        if self._uses_template_properties():
+            return [PROPERTIES_FIELD] if fnames else []
+        return [fname for fname in fnames if fname in self._fields]
+
+    @api.model
+    def _flatten_template_values(self, values):
+        """Replace the properties of read ``values`` by one ``x_field*`` key per template"""
+        for prop in values.pop(PROPERTIES_FIELD, None) or []:
+            values[prop['name']] = prop.get('value')
+        return values
+
+    def _get_template_values(self):
+        """Return {fname: value} of the template values of this record"""
+        self.ensure_one()
+        if self._uses_template_properties():
+            return self._flatten_template_values(self.read([PROPERTIES_FIELD])[0])
+        return {fname: self[fname] for fname in self._get_template_fnames()}
+
+    def _pop_template_values(self, vals):
+        """Remove template values from ``vals`` when they are stored as properties"""
+        if not self._uses_template_properties():
+            return {}
+        return {key: vals.pop(key) for key in list(vals) if TEMPLATE_FNAME_RE.match(key)}
+
+    def _write_template_values(self, template_vals):
+        """Store ``{fname: value}`` into the properties of the records"""
+        if not template_vals:
+            return
+        # One read for all records and one write per distinct payload: records
+        # of a department sharing their other values are written together
+        ids_by_payload = defaultdict(list)
+        payloads = {}
+        for values in self.read([PROPERTIES_FIELD]):
+            properties = values[PROPERTIES_FIELD] or []
+            for prop in properties:
+                if prop['name'] in template_vals:
+                    prop['value'] = template_vals[prop['name']]
+            key = json.dumps(properties, sort_keys=True, default=str)
+            payloads[key] = properties
+            ids_by_payload[key].append(values['id'])
+        for key, record_ids in ids_by_payload.items():
+            self.browse(record_ids).write({PROPERTIES_FIELD: payloads[key]})
+
+    @api.model
+    def _translate_template_domain(self, domain):
+        """Point ``x_field*`` leaves of ``domain`` to the properties field"""
+        if not isinstance(domain, (list, tuple)) or not self._uses_template_properties():
+            return domain
+        return [
+            (f'{PROPERTIES_FIELD}.{leaf[0]}', leaf[1], leaf[2])
+            if isinstance(leaf, (list, tuple)) and len(leaf) == 3
+            and isinstance(leaf[0], str) and TEMPLATE_FNAME_RE.match(leaf[0])
+            else leaf
+            for leaf in domain
+        ]
+
+    @api.model
+    def _search(self, domain, *args, **kwargs):
+        return super()._search(self._translate_template_domain(domain), *args, **kwargs)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        template_vals_list = [self._pop_template_values(vals) for vals in vals_list]
+        records = super().create(vals_list)
+        # Records created with the same template values are written together
+        groups = {}
+        for record, template_vals in zip(records, template_vals_list):
+            if template_vals:
+                key = json.dumps(template_vals, sort_keys=True, default=str)
+                groups.setdefault(key, (template_vals, []))[1].append(record.id)
+        for template_vals, record_ids in groups.values():
+            self.browse(record_ids)._write_template_values(template_vals)
+        return records
+
+    def write(self, vals):
+        template_vals = self._pop_template_values(vals)
+        res = super().write(vals) if vals else True
+        self._write_template_values(template_vals)
+        return res
+
+    @api.model
+    def _get_template_labels(self):
+        """Return {fname: label} of the active templates in the user's language"""
+        return self._get_template_labels_cached(
+            self.env.lang or 'en_US', self.env['peepl.field.template']._get_template_version())
+
+    @api.model
+    @tools.ormcache('lang', 'version')
+    def _get_template_labels_cached(self, lang, version):
+        templates = self.env['peepl.field.template'].sudo().with_context(lang=lang).search([('active', '=', True)])
+        return {template._column_name(): template.name for template in templates}
+
     @api.model
     def fields_get(self, allfields=None, attributes=None):
         """Filter dynamic fields based on department filter"""
         fields = super().fields_get(allfields, attributes)
         try:
             if not self.env.context.get("studio"):
-                templates = self.env['peepl.field.template'].search([('active', '=', True)])
-                for template in templates:
-                    fname = template._column_name()
-                    if fname in fields:
-                        fields[fname]['string'] = template.name
+                for fname, label in self._get_template_labels().items():
+                    if fname in fields and 'string' in fields[fname]:
+                        fields[fname]['string'] = label
         except Exception:
             pass
         return fields
 
+    @api.model
+    def _get_view_cache_key(self, view_id=None, view_type='form', **options):
+        """Patched arches depend on the department scope and the template set version"""
+        key = super()._get_view_cache_key(view_id, view_type, **options)
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        return key + (
+            self.env.context.get('dept_filter'),
+            self.env.context.get('default_department_id'),
+            profile.is_bod,
+            tuple(self.env.user.weekly_report_department_ids.ids),
+            self.env['peepl.field.template']._get_template_version(),
+        )
+
     def _get_view(self, view_id=None, view_type='form', **options):
         """Intercept view to patch it with dynamic fields"""
         arch, view = super()._get_view(view_id, view_type, **options)
@@ -249,7 +519,25 @@ class PeeplFieldTemplateMixin(models.AbstractModel):
     def _patch_view(self, arch, view, view_type):
         """Inject template fields into views dynamically"""
         try:
-            if not self.env.context.get("studio"):
+            if not self.env.context.get("studio") and self._uses_template_properties():
+                # JSONB storage: one properties field carries every template of the department
+                view_fnames = {node.get('name') for node in arch.iter('field')}
+                if view_type == 'list':
+                    target = arch
+                else:
+                    groups = arch.findall('.//group')
+                    target = groups[1] if len(groups) >= 2 else None
+                if view_type in ('list', 'form') and target is not None and PROPERTIES_FIELD not in view_fnames:
+                    if 'department_id' not in view_fnames:
+                        target.append(E.field(name='department_id', column_invisible='1') if view_type == 'list'
+                                      else E.field(name='department_id', invisible='1'))
+                    field_attrs = {'name': PROPERTIES_FIELD}
+                    if view_type == 'list':
+                        field_attrs['optional'] = 'show'
+                    else:
+                        field_attrs.update(nolabel='1', colspan='2')
+                    target.append(E.field(**field_attrs))
+            elif not self.env.context.get("studio"):
                 # Search templates - record rules will automatically filter by department
                 templates = self.env['peepl.field.template'].search([('active', '=', True)], order='sequence')
                 
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from collections import defaultdict
+
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+STATUS_COLUMNS = ['completed', 'in_progress', 'not_started', 'delayed', 'plan', 'overdue']
+PENDING_CHANGES_KEY = 'peepl.pic.overview.pending'
+# Columns the overview lists can be sorted on and sought by (value, id)
+KEYSET_SORT_FIELDS = ['job_position', 'total_tasks'] + STATUS_COLUMNS + ['avg_progress']
+
 
 class PeeplPicOverview(models.Model):
     _name = 'peepl.pic.overview'
     _description = 'PIC Overview'
+    _inherit = ['peepl.facet.mixin']
 
     user_id = fields.Many2one('res.users', string='User', required=True)
     department_id = fields.Many2one('hr.department', string='Department')
@@ -17,6 +27,12 @@ class PeeplPicOverview(models.Model):
     plan = fields.Integer(string='Plan')
     overdue = fields.Integer(string='Overdue')
     avg_progress = fields.Float(string='Avg Progress (%)')
+    progress_sum = fields.Integer(string='Progress Sum')
+
+    def init(self):
+        super().init()
+        for fname in KEYSET_SORT_FIELDS:
+            tools.create_index(self.env.cr, f'{self._table}_{fname}_id_index', self._table, [fname, 'id'])
 
     @api.model
     def _migrate_position_to_job_position(self):
@@ -29,48 +45,469 @@ class PeeplPicOverview(models.Model):
             self.env.cr.commit()
         except Exception as e:
             print(f"Migration error: {e}")
-    
+
+    @api.model
+    def _get_maintenance_mode(self):
+        """Return how report changes are propagated to the overview.
+
+        ``incremental`` (default) adjusts only the rows of the PICs touched by
+        a change, ``full`` rebuilds every row like the historical behaviour and
+        ``materialized`` leaves the table alone: statistics are read from the
+        ``peepl.pic.overview.snapshot`` materialized view, refreshed by cron.
+        """
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'peepl_weekly_report.pic_overview_mode', 'incremental')
+
+    @api.model
+    def _prepare_assignment_vals(self, user_ids):
+        """Return {user_id: vals} with department and job position from the active assignment"""
+        assignments = self.env['peepl.user.assignment'].sudo().search([
+            ('user_id', 'in', list(user_ids)),
+            ('active', '=', True)
+        ], order='id')
+        result = {
+            user_id: {'department_id': False, 'job_position': 'No Position'}
+            for user_id in user_ids
+        }
+        seen = set()
+        for assignment in assignments:
+            user_id = assignment.user_id.id
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            result[user_id] = {
+                'department_id': assignment.department_id.id if assignment.department_id else False,
+                'job_position': assignment.job_id.name if assignment.job_id else 'No Position',
+            }
+        return result
+
     @api.model
     def update_all_stats(self):
-        """Update all PIC overview statistics"""
-        users_with_reports = self.env['peepl.weekly.report'].search([]).mapped('pic_id')
-        
-        all_overview_records = self.search([])
-        users_to_keep = set(users_with_reports.ids)
-        records_to_delete = all_overview_records.filtered(lambda r: r.user_id.id not in users_to_keep)
-        records_to_delete.unlink()
-        
-        for user in users_with_reports:
-            assignment = self.env['peepl.user.assignment'].sudo().search([
-                ('user_id', '=', user.id),
-                ('active', '=', True)
-            ], limit=1)
-            
-            reports = self.env['peepl.weekly.report'].search([('pic_id', '=', user.id)])
-            existing = self.search([('user_id', '=', user.id)], limit=1)
-            
-            vals = {
-                'user_id': user.id,
-                'department_id': assignment.department_id.id if assignment and assignment.department_id else False,
-                'job_position': assignment.job_id.name if assignment and assignment.job_id else 'No Position',
-                'total_tasks': len(reports),
-                'completed': len(reports.filtered(lambda r: r.status == 'completed')),
-                'in_progress': len(reports.filtered(lambda r: r.status == 'in_progress')),
-                'not_started': len(reports.filtered(lambda r: r.status == 'not_started')),
-                'delayed': len(reports.filtered(lambda r: r.status == 'delayed')),
-                'plan': len(reports.filtered(lambda r: r.status == 'plan')),
-                'overdue': len(reports.filtered(lambda r: r.status == 'overdue')),
-                'avg_progress': sum(reports.mapped('progress')) / len(reports) if reports else 0.0,
+        """Rebuild all PIC overview statistics (repair action)"""
+        if self._get_maintenance_mode() == 'materialized':
+            self.env['peepl.pic.overview.snapshot'].sudo()._refresh()
+        else:
+            self._aggregate_stats()
+            self._bump_facet_version()
+
+    @api.model
+    def _refresh_users(self, user_ids):
+        """Recompute the overview rows of ``user_ids`` from their reports"""
+        user_ids = [user_id for user_id in set(user_ids) if user_id]
+        if user_ids:
+            self._aggregate_stats(user_ids)
+
+    @api.model
+    def _get_stats_query(self, where='TRUE', today='%(today)s'):
+        """Return the SELECT computing one statistics row per PIC.
+
+        ``where`` filters the aggregated reports (alias ``wr``); the query
+        expects a ``lang`` parameter for the job position translation and a
+        ``today`` parameter (unless ``today`` is overridden) for the
+        effective status mode.
+        """
+        return """
+            SELECT s.*,
+                   a.department_id,
+                   COALESCE(a.job_position, 'No Position') AS job_position
+              FROM (
+                    SELECT wr.pic_id AS user_id,
+                           COUNT(*) AS total_tasks,
+                           COUNT(*) FILTER (WHERE %(status)s = 'completed') AS completed,
+                           COUNT(*) FILTER (WHERE %(status)s = 'in_progress') AS in_progress,
+                           COUNT(*) FILTER (WHERE %(status)s = 'not_started') AS not_started,
+                           COUNT(*) FILTER (WHERE %(status)s = 'delayed') AS delayed,
+                           COUNT(*) FILTER (WHERE %(status)s = 'plan') AS plan,
+                           COUNT(*) FILTER (WHERE %(status)s = 'overdue') AS overdue,
+                           SUM(COALESCE(wr.progress, 0)) AS progress_sum,
+                           AVG(COALESCE(wr.progress, 0))::float AS avg_progress
+                      FROM peepl_weekly_report wr
+                     WHERE wr.pic_id IS NOT NULL
+                       AND %(where)s
+                  GROUP BY wr.pic_id
+                   ) s
+         LEFT JOIN LATERAL (
+                    SELECT ua.department_id,
+                           COALESCE(j.name->>%%(lang)s, j.name->>'en_US') AS job_position
+                      FROM peepl_user_assignment ua
+                 LEFT JOIN hr_job j ON j.id = ua.job_id
+                     WHERE ua.active
+                       AND ua.user_id = s.user_id
+                  ORDER BY ua.id
+                     LIMIT 1
+                   ) a ON TRUE
+        """ % {
+            'where': where,
+            'status': self.env['peepl.weekly.report']._get_effective_status_sql('wr', today),
+        }
+
+    @api.model
+    def _aggregate_stats(self, user_ids=None):
+        """Upsert overview rows from one GROUP BY over the weekly reports.
+
+        Rows of PICs without reports are deleted. When ``user_ids`` is given
+        only the rows of those users are touched, otherwise every row is.
+        """
+        # Queued changes of the rebuilt rows are already part of the result
+        pending = self.env.cr.precommit.data.get(PENDING_CHANGES_KEY)
+        if pending and user_ids is None:
+            self.env.cr.precommit.data.pop(PENDING_CHANGES_KEY)
+        elif pending:
+            for user_id in user_ids:
+                pending['deltas'].pop(user_id, None)
+            pending['dirty_user_ids'].difference_update(user_ids)
+
+        self.env['peepl.weekly.report'].flush_model(['pic_id', 'status', 'deadline', 'progress'])
+        self.env['peepl.user.assignment'].flush_model(['user_id', 'department_id', 'job_id', 'active'])
+        self.flush_model()
+        self.env.cr.execute("""
+            WITH info AS (%s),
+            kept AS (
+                SELECT MIN(o.id) AS id
+                  FROM peepl_pic_overview o
+                 WHERE o.user_id IN (SELECT user_id FROM info)
+              GROUP BY o.user_id
+            ),
+            deleted AS (
+                DELETE FROM peepl_pic_overview o
+                 WHERE (%%(all)s OR o.user_id = ANY(%%(user_ids)s))
+                   AND o.id NOT IN (SELECT id FROM kept)
+            ),
+            updated AS (
+                UPDATE peepl_pic_overview o
+                   SET department_id = i.department_id,
+                       job_position = i.job_position,
+                       total_tasks = i.total_tasks,
+                       completed = i.completed,
+                       in_progress = i.in_progress,
+                       not_started = i.not_started,
+                       delayed = i.delayed,
+                       plan = i.plan,
+                       overdue = i.overdue,
+                       progress_sum = i.progress_sum,
+                       avg_progress = i.avg_progress,
+                       write_uid = %%(uid)s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM info i
+                 WHERE o.user_id = i.user_id
+                   AND o.id IN (SELECT id FROM kept)
+             RETURNING o.user_id
+            )
+            INSERT INTO peepl_pic_overview (
+                user_id, department_id, job_position, total_tasks, completed,
+                in_progress, not_started, delayed, plan, overdue, progress_sum,
+                avg_progress, create_uid, create_date, write_uid, write_date)
+            SELECT i.user_id, i.department_id, i.job_position, i.total_tasks, i.completed,
+                   i.in_progress, i.not_started, i.delayed, i.plan, i.overdue, i.progress_sum,
+                   i.avg_progress, %%(uid)s, (now() at time zone 'UTC'), %%(uid)s, (now() at time zone 'UTC')
+              FROM info i
+             WHERE i.user_id NOT IN (SELECT user_id FROM updated)
+        """ % self._get_stats_query('(%(all)s OR wr.pic_id = ANY(%(user_ids)s))'), {
+            'all': user_ids is None,
+            'user_ids': list(user_ids or []),
+            'lang': self.env.lang or 'en_US',
+            'today': self.env['peepl.weekly.report']._get_company_today(),
+            'uid': self.env.uid,
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _process_report_changes(self, before=None, after=None):
+        """Queue report changes, applied once at commit by ``_flush_pending_changes``"""
+        mode = self._get_maintenance_mode()
+        if mode == 'materialized':
+            return
+        if before is not None and after is not None and mode != 'full' \
+                and self.env['peepl.weekly.report']._get_status_mode() == 'effective':
+            # The effective status of untouched reports moves with the date,
+            # so status deltas would drift: recompute the PICs instead
+            self._mark_users_dirty({pic_id for pic_id, _status, _progress in before + after if pic_id})
+            return
+        pending = self._get_pending_changes()
+        if before is None or after is None or mode == 'full':
+            pending['full'] = True
+        elif not pending['full']:
+            self._merge_report_deltas(pending['deltas'], before, after)
+
+    @api.model
+    def _process_assignment_changes(self, user_ids):
+        """Queue assignment changes, applied once at commit by ``_flush_pending_changes``"""
+        mode = self._get_maintenance_mode()
+        if mode == 'materialized':
+            return
+        pending = self._get_pending_changes()
+        if mode == 'full':
+            pending['full'] = True
+        else:
+            pending['assignment_user_ids'].update(user_ids)
+
+    @api.model
+    def _mark_users_dirty(self, user_ids):
+        """Queue a recomputation of the rows of ``user_ids`` at commit.
+
+        Used for the changes counters cannot follow, such as report changes
+        in effective status mode (see ``_process_report_changes``).
+        """
+        if self._get_maintenance_mode() == 'materialized':
+            return
+        self._get_pending_changes()['dirty_user_ids'].update(user_ids)
+
+    @api.model
+    def _get_pending_changes(self):
+        """Return the overview changes collected in the current transaction"""
+        data = self.env.cr.precommit.data
+        pending = data.get(PENDING_CHANGES_KEY)
+        if pending is None:
+            pending = data[PENDING_CHANGES_KEY] = {
+                'full': False,
+                'deltas': defaultdict(lambda: defaultdict(int)),
+                'assignment_user_ids': set(),
+                'dirty_user_ids': set(),
             }
-            
-            if existing:
-                existing.write(vals)
+            self.env.cr.precommit.add(self.sudo()._flush_pending_changes)
+        return pending
+
+    def _flush_pending_changes(self):
+        """Apply the overview changes collected in the transaction in one go"""
+        pending = self.env.cr.precommit.data.pop(PENDING_CHANGES_KEY, None)
+        if not pending:
+            return
+        self.env.flush_all()
+        if pending['full']:
+            self.update_all_stats()
+        else:
+            dirty_user_ids = set(pending['dirty_user_ids'])
+            dirty_user_ids |= self._apply_report_deltas(pending['deltas'], skip_user_ids=dirty_user_ids)
+            self._refresh_users(dirty_user_ids)
+            self._refresh_assignment_info(pending['assignment_user_ids'] - dirty_user_ids)
+            # Counter updates alone leave the faceted users and departments as they are
+            if dirty_user_ids or pending['assignment_user_ids']:
+                self._bump_facet_version()
+        self.env.flush_all()
+
+    @api.model
+    def get_overview_model(self):
+        """Return the model the PIC overview screens should read from"""
+        if self._get_maintenance_mode() == 'materialized':
+            return 'peepl.pic.overview.snapshot'
+        return self._name
+
+    @api.model
+    def get_dashboard_data(self):
+        """Return everything the dashboard displays, aggregated on the server.
+
+        Statistics come from the overview rows and report counts from one
+        ``read_group``, all scoped by the caller's record rules, so the
+        payload grows with the number of departments and PICs only.
+        """
+        Overview = self.env[self.get_overview_model()]
+        stat_fields = ['total_tasks'] + STATUS_COLUMNS
+        pic_data = Overview.search_read([], ['user_id', 'job_position'] + stat_fields)
+        user_ids = [pic['user_id'][0] for pic in pic_data]
+
+        # Department and division of every visible user, from their first active assignment
+        assignment_by_user = {}
+        for assignment in self.env['peepl.user.assignment'].search([('active', '=', True)], order='id'):
+            assignment_by_user.setdefault(assignment.user_id.id, assignment)
+        task_counts = {
+            pic.id: count
+            for pic, count in self.env['peepl.weekly.report']._read_group(
+                [('pic_id', 'in', user_ids)], ['pic_id'], ['__count'])
+        }
+
+        departments = {}
+        divisions = {}
+        for assignment in assignment_by_user.values():
+            department = assignment.department_id
+            if department:
+                departments.setdefault(department.id, {
+                    'id': department.id,
+                    'name': department.name,
+                    'total_users': 0,
+                    'total_pics': 0,
+                    'total_tasks': 0,
+                    'chart': {'users': [], 'tasks': []},
+                })['total_users'] += 1
+            division = assignment.division_id
+            if division:
+                divisions.setdefault((department.id, division.id), {
+                    'id': division.id,
+                    'name': division.name,
+                    'department_id': department.id,
+                    'department_name': department.name or False,
+                    'total_users': 0,
+                    **dict.fromkeys(stat_fields, 0),
+                })['total_users'] += 1
+
+        total_stats = dict.fromkeys(stat_fields, 0)
+        for pic in pic_data:
+            assignment = assignment_by_user.get(pic['user_id'][0])
+            department = assignment.department_id if assignment else self.env['hr.department']
+            division = assignment.division_id if assignment else self.env['peepl.division']
+            pic['department_name'] = department.name or '-'
+            pic['division_name'] = division.name or '-'
+            for fname in stat_fields:
+                total_stats[fname] += pic[fname] or 0
+            if department.id in departments:
+                dept = departments[department.id]
+                dept['total_pics'] += 1
+                dept['total_tasks'] += pic['total_tasks'] or 0
+                dept['chart']['users'].append(pic['user_id'][1])
+                dept['chart']['tasks'].append(task_counts.get(pic['user_id'][0], 0))
+            if (department.id, division.id) in divisions:
+                stats = divisions[department.id, division.id]
+                for fname in stat_fields:
+                    stats[fname] += pic[fname] or 0
+
+        return {
+            'pic_data': pic_data,
+            'departments': sorted(departments.values(), key=lambda dept: dept['name']),
+            'divisions': sorted(divisions.values(), key=lambda division: (division['department_name'] or '', division['name'])),
+            'total_stats': total_stats,
+        }
+
+    @api.model
+    def get_overview_page(self, domain=None, sort_field='user_id', sort_order='asc', limit=20, offset=0, after=None):
+        """Return one page of the overview list with its total.
+
+        Sorting on a column of ``KEYSET_SORT_FIELDS`` pages by seek: ``after``
+        is the ``next_after`` key returned with the previous page and the
+        page is read from the ``(column, id)`` index, whatever its depth.
+        Other sorts (many2one fields, ordered by name) page with ``offset``.
+        """
+        Overview = self.env[self.get_overview_model()]
+        domain = domain or []
+        fields_list = [
+            'user_id', 'department_id', 'job_position', 'total_tasks', 'completed', 'in_progress',
+            'not_started', 'delayed', 'plan', 'overdue', 'avg_progress',
+        ]
+        direction = 'DESC' if sort_order == 'desc' else 'ASC'
+        next_after = False
+        if sort_field in KEYSET_SORT_FIELDS:
+            query = Overview._search(domain)
+            column = SQL.identifier(Overview._table, sort_field)
+            id_column = SQL.identifier(Overview._table, 'id')
+            if after:
+                query.add_where(self._get_keyset_condition(column, id_column, direction, *after))
             else:
-                self.create(vals)
+                query.offset = offset
+            query.order = SQL("%s %s, %s %s", column, SQL(direction), id_column, SQL(direction))
+            query.limit = limit
+            self.env.cr.execute(query.select(id_column, column))
+            rows = self.env.cr.fetchall()
+            records = Overview.browse([row[0] for row in rows]).read(fields_list)
+            if rows:
+                next_after = [rows[-1][1], rows[-1][0]]
+        else:
+            records = Overview.search_read(
+                domain, fields_list, offset=offset, limit=limit, order=f'{sort_field} {direction}, id {direction}')
+        return {
+            'records': records,
+            'total': Overview.search_count(domain),
+            'next_after': next_after,
+        }
+
+    @api.model
+    def _get_keyset_condition(self, column, id_column, direction, value, record_id):
+        """Return the condition selecting the rows after ``(value, record_id)``.
+
+        NULLs come last in ascending order and first in descending order,
+        like in the ORDER BY of ``get_overview_page``.
+        """
+        if direction == 'ASC':
+            if value is None:
+                return SQL("(%s IS NULL AND %s > %s)", column, id_column, record_id)
+            return SQL("((%s, %s) > (%s, %s) OR %s IS NULL)", column, id_column, value, record_id, column)
+        if value is None:
+            return SQL("(%s IS NOT NULL OR %s < %s)", column, id_column, record_id)
+        return SQL("(%s, %s) < (%s, %s)", column, id_column, value, record_id)
+
+    @api.model
+    def _refresh_assignment_info(self, user_ids):
+        """Refresh department and job position of the overview rows of ``user_ids``"""
+        self = self.sudo()
+        user_ids = [user_id for user_id in set(user_ids) if user_id]
+        if not user_ids:
+            return
+        assignment_vals = self._prepare_assignment_vals(user_ids)
+        for overview in self.search([('user_id', 'in', user_ids)]):
+            overview.write(assignment_vals[overview.user_id.id])
+
+    @api.model
+    def _merge_report_deltas(self, deltas, before, after):
+        """Accumulate into ``deltas`` the counter changes of a report change.
+
+        ``before`` and ``after`` are lists of ``(pic_id, status, progress)``
+        tuples describing the affected reports before and after the change.
+        """
+        for sign, rows in ((-1, before), (1, after)):
+            for pic_id, status, progress in rows:
+                if not pic_id:
+                    continue
+                delta = deltas[pic_id]
+                delta['total_tasks'] += sign
+                delta['progress_sum'] += sign * (progress or 0)
+                if status in STATUS_COLUMNS:
+                    delta[status] += sign
+        return deltas
+
+    @api.model
+    def _apply_report_deltas(self, deltas, skip_user_ids=()):
+        """Adjust the counters of the PICs in ``deltas`` (see ``_merge_report_deltas``).
+
+        Counters are updated in place so concurrent transactions cannot
+        overwrite each other. Returns the PICs without a usable row, which
+        must be recomputed.
+        """
+        deltas = {
+            pic_id: delta for pic_id, delta in deltas.items()
+            if pic_id not in skip_user_ids and any(delta.values())
+        }
+        if not deltas:
+            return set()
+
+        self.flush_model()
+        to_refresh = set()
+        to_delete = []
+        for pic_id, delta in deltas.items():
+            params = {column: delta[column] for column in ['total_tasks', 'progress_sum'] + STATUS_COLUMNS}
+            params.update(user_id=pic_id, uid=self.env.uid)
+            self.env.cr.execute("""
+                UPDATE peepl_pic_overview
+                   SET total_tasks = COALESCE(total_tasks, 0) + %(total_tasks)s,
+                       completed = COALESCE(completed, 0) + %(completed)s,
+                       in_progress = COALESCE(in_progress, 0) + %(in_progress)s,
+                       not_started = COALESCE(not_started, 0) + %(not_started)s,
+                       delayed = COALESCE(delayed, 0) + %(delayed)s,
+                       plan = COALESCE(plan, 0) + %(plan)s,
+                       overdue = COALESCE(overdue, 0) + %(overdue)s,
+                       progress_sum = progress_sum + %(progress_sum)s,
+                       avg_progress = CASE
+                           WHEN COALESCE(total_tasks, 0) + %(total_tasks)s > 0
+                           THEN (progress_sum + %(progress_sum)s)::float / (COALESCE(total_tasks, 0) + %(total_tasks)s)
+                           ELSE 0
+                       END,
+                       write_uid = %(uid)s,
+                       write_date = (now() at time zone 'UTC')
+                 WHERE user_id = %(user_id)s
+                   AND progress_sum IS NOT NULL
+             RETURNING id, total_tasks
+            """, params)
+            rows = self.env.cr.fetchall()
+            if not rows:
+                # No row yet, or a row written before progress_sum existed
+                to_refresh.add(pic_id)
+            to_delete += [row_id for row_id, total in rows if total <= 0]
+
+        self.invalidate_model()
+        if to_delete:
+            self.browse(to_delete).sudo().unlink()
+            self._bump_facet_version()
+        return to_refresh
 
     def update_overview(self):
         self.update_all_stats()
         return {
             'type': 'ir.actions.client',
             'tag': 'reload',
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools
+
+from .peepl_pic_overview import KEYSET_SORT_FIELDS
+
+# One row holding the company date and the status mode the snapshot is computed with
+PARAMS_TABLE = 'peepl_pic_overview_snapshot_params'
+
+
+class PeeplPicOverviewSnapshot(models.Model):
+    _name = 'peepl.pic.overview.snapshot'
+    _description = 'PIC Overview (Materialized)'
+    _inherit = ['peepl.facet.mixin']
+    _auto = False
+
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    job_position = fields.Char(string='Job Position', readonly=True)
+    total_tasks = fields.Integer(string='Total Tasks', readonly=True)
+    completed = fields.Integer(string='Completed', readonly=True)
+    in_progress = fields.Integer(string='In Progress', readonly=True)
+    not_started = fields.Integer(string='Not Started', readonly=True)
+    delayed = fields.Integer(string='Delayed', readonly=True)
+    plan = fields.Integer(string='Plan', readonly=True)
+    overdue = fields.Integer(string='Overdue', readonly=True)
+    avg_progress = fields.Float(string='Avg Progress (%)', readonly=True)
+    progress_sum = fields.Integer(string='Progress Sum', readonly=True)
+
+    def init(self):
+        self.env.cr.execute(
+            f"CREATE TABLE IF NOT EXISTS {PARAMS_TABLE} (today date NOT NULL, status_mode varchar NOT NULL)")
+        # The view is only maintained in the materialized mode; _refresh builds
+        # it when the mode is enabled later
+        if self.env['peepl.pic.overview']._get_maintenance_mode() == 'materialized':
+            self._build()
+
+    @api.model
+    def _build(self):
+        """(Re)create the materialized view and its indexes"""
+        self._set_snapshot_params()
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        # The view reads the company date from the params table (set at each
+        # refresh); the status mode is part of its definition
+        self.env.cr.execute("""
+            CREATE MATERIALIZED VIEW %s AS (
+                SELECT info.user_id AS id, info.*
+                  FROM (%s) info
+            )
+        """ % (self._table, self.env['peepl.pic.overview']._get_stats_query(
+            today=f'(SELECT today FROM {PARAMS_TABLE})')), {'lang': 'en_US'})
+        # A unique index is required by REFRESH ... CONCURRENTLY
+        self.env.cr.execute("CREATE UNIQUE INDEX %s_id_idx ON %s (id)" % (self._table, self._table))
+        self.env.cr.execute("CREATE INDEX %s_department_id_idx ON %s (department_id)" % (self._table, self._table))
+        for fname in KEYSET_SORT_FIELDS:
+            self.env.cr.execute("CREATE INDEX %s_%s_id_idx ON %s (%s, id)" % (self._table, fname, self._table, fname))
+
+    @api.model
+    def _set_snapshot_params(self):
+        """Record the company date and the status mode used by the next refresh"""
+        Report = self.env['peepl.weekly.report']
+        self.env.cr.execute(f"DELETE FROM {PARAMS_TABLE}")
+        self.env.cr.execute(f"INSERT INTO {PARAMS_TABLE} (today, status_mode) VALUES (%s, %s)",
+                            [Report._get_company_today(), Report._get_status_mode()])
+
+    @api.model
+    def _refresh(self):
+        """Refresh the snapshot without blocking readers.
+
+        When the view does not exist yet or ``peepl_weekly_report.status_mode``
+        changed since it was built, the view is built with the current status
+        expression instead.
+        """
+        self.env['peepl.weekly.report'].flush_model()
+        self.env['peepl.user.assignment'].flush_model()
+        self.env.cr.execute(f"SELECT status_mode FROM {PARAMS_TABLE}")
+        row = self.env.cr.fetchone()
+        if (not row or row[0] != self.env['peepl.weekly.report']._get_status_mode()
+                or tools.sql.table_kind(self.env.cr, self._table) is None):
+            self._build()
+        else:
+            self._set_snapshot_params()
+            self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_model()
+        self._bump_facet_version()
+
+    @api.model
+    def _cron_refresh(self):
+        """Cron job refreshing the snapshot when the materialized mode is enabled"""
+        if self.env['peepl.pic.overview']._get_maintenance_mode() == 'materialized':
+            self._refresh()
@@ -1,8 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from collections import namedtuple
+
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
 
+AccessProfile = namedtuple('AccessProfile', [
+    'is_bod', 'is_manager', 'is_supervisor', 'is_staff',
+    'assignment_id', 'department_id', 'division_id',
+    'department_user_ids', 'division_user_ids',
+])
+
+
 class PeeplUserAssignment(models.Model):
     _name = 'peepl.user.assignment'
     _description = 'Peepl User Assignment'
@@ -19,12 +28,50 @@ class PeeplUserAssignment(models.Model):
     assigned_by = fields.Many2one('res.users', string='Assigned By', default=lambda self: self.env.user, readonly=True)
     active = fields.Boolean(string='Active', default=True)
 
+    @api.model
+    def _get_access_profile(self, user_id=None):
+        """Return the weekly report access profile of ``user_id`` (current user by default).
+
+        The profile holds the role flags, the active assignment and the users
+        sharing its department and division. It is cached until assignments
+        or group memberships change (both clear the registry cache).
+        """
+        return self._get_access_profile_cached(user_id or self.env.uid)
+
+    @api.model
+    @tools.ormcache('user_id')
+    def _get_access_profile_cached(self, user_id):
+        user = self.env['res.users'].sudo().browse(user_id)
+        assignment = self.sudo().search([('user_id', '=', user_id), ('active', '=', True)], limit=1)
+        department_user_ids = division_user_ids = ()
+        if assignment.department_id:
+            department_user_ids = tuple(self.sudo().search([
+                ('department_id', '=', assignment.department_id.id),
+                ('active', '=', True)
+            ]).mapped('user_id').ids)
+        if assignment.division_id:
+            division_user_ids = tuple(self.sudo().search([
+                ('division_id', '=', assignment.division_id.id),
+                ('active', '=', True)
+            ]).mapped('user_id').ids)
+        return AccessProfile(
+            is_bod=user.has_group('peepl_weekly_report.group_peepl_bod'),
+            is_manager=user.has_group('peepl_weekly_report.group_peepl_manager'),
+            is_supervisor=user.has_group('peepl_weekly_report.group_peepl_supervisor'),
+            is_staff=user.has_group('peepl_weekly_report.group_peepl_staff'),
+            assignment_id=assignment.id,
+            department_id=assignment.department_id.id,
+            division_id=assignment.division_id.id,
+            department_user_ids=department_user_ids,
+            division_user_ids=division_user_ids,
+        )
+
     @api.depends('division_id', 'user_id')
     def _compute_division_users(self):
         for record in self:
             if record.division_id:
-                current_user = self.env.user
-                if current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_bod'):
+                profile = self._get_access_profile()
+                if profile.is_manager or profile.is_bod:
                     division_assignments = self.sudo().search([
                         ('division_id', '=', record.division_id.id),
                         ('active', '=', True),
@@ -37,9 +84,10 @@ class PeeplUserAssignment(models.Model):
                     
                     for assignment in division_assignments:
                         user_name = assignment.user_id.name
-                        if assignment.user_id.has_group('peepl_weekly_report.group_peepl_manager'):
+                        user_profile = self._get_access_profile(assignment.user_id.id)
+                        if user_profile.is_manager:
                             managers.append(user_name)
-                        elif assignment.user_id.has_group('peepl_weekly_report.group_peepl_supervisor'):
+                        elif user_profile.is_supervisor:
                             supervisors.append(user_name)
                         else:
                             staff.append(user_name)
@@ -116,29 +164,31 @@ class PeeplUserAssignment(models.Model):
 
     def write(self, vals):
         # Permission checks BEFORE write
-        current_user = self.env.user
-        if not current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-            if current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
+        profile = self._get_access_profile()
+        if not profile.is_bod:
+            if profile.is_supervisor:
                 # Supervisor: only same division
-                supervisor_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
-                if supervisor_assignment and supervisor_assignment.division_id:
-                    if vals.get('division_id') and vals['division_id'] != supervisor_assignment.division_id.id:
+                if profile.division_id:
+                    if vals.get('division_id') and vals['division_id'] != profile.division_id:
                         raise ValidationError("Supervisor can only assign users to their own division.")
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
-                manager_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
+            elif profile.is_manager:
                 if vals.get('job_id'):
                     job = self.env['hr.job'].browse(vals['job_id'])
                     if job.name and 'manager' in job.name.lower():
                         raise ValidationError("Manager cannot assign other Manager positions.")
-                if manager_assignment and vals.get('department_id') and vals['department_id'] != manager_assignment.department_id.id:
+                if profile.assignment_id and vals.get('department_id') and vals['department_id'] != profile.department_id:
                     raise ValidationError("Manager can only assign users to their own department.")
             else:
                 raise ValidationError("You don't have permission to modify assignments.")
         
+        previous_user_ids = self.mapped('user_id').ids
         result = super(PeeplUserAssignment, self).write(vals)
+        self.env.registry.clear_cache()
         # Trigger PIC overview update with sudo
         if 'user_id' in vals or 'job_id' in vals or 'department_id' in vals or 'active' in vals:
-            self.sudo()._update_pic_overview()
+            self.sudo()._update_pic_overview(previous_user_ids)
+        if 'user_id' in vals or 'department_id' in vals or 'division_id' in vals or 'active' in vals:
+            self._update_report_departments(previous_user_ids)
         return result
 
     @api.model
@@ -147,24 +197,22 @@ class PeeplUserAssignment(models.Model):
             vals_list = [vals_list]
         
         # Permission checks BEFORE create
-        current_user = self.env.user
-        if not current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-            if current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
+        profile = self._get_access_profile()
+        if not profile.is_bod:
+            if profile.is_supervisor:
                 # Supervisor: only same division
-                supervisor_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
                 for vals in vals_list:
-                    if supervisor_assignment and supervisor_assignment.division_id:
-                        if vals.get('division_id') and vals['division_id'] != supervisor_assignment.division_id.id:
+                    if profile.division_id:
+                        if vals.get('division_id') and vals['division_id'] != profile.division_id:
                             raise ValidationError("Supervisor can only assign users to their own division.")
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
+            elif profile.is_manager:
                 # Manager/Supervisor checks
-                manager_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
                 for vals in vals_list:
                     if vals.get('job_id'):
                         job = self.env['hr.job'].browse(vals['job_id'])
                         if job.name and 'manager' in job.name.lower():
                             raise ValidationError("Manager cannot assign other Manager positions.")
-                    if manager_assignment and vals.get('department_id') and vals['department_id'] != manager_assignment.department_id.id:
+                    if profile.assignment_id and vals.get('department_id') and vals['department_id'] != profile.department_id:
                         raise ValidationError("Manager can only assign users to their own department.")
             else:
                 raise ValidationError("You don't have permission to assign users.")
@@ -186,12 +234,27 @@ class PeeplUserAssignment(models.Model):
                         vals['department_id'] = False
         
         result = super(PeeplUserAssignment, self).create(vals_list)
-        self.sudo()._update_pic_overview()
+        self.env.registry.clear_cache()
+        result.sudo()._update_pic_overview()
+        result._update_report_departments()
+        return result
+
+    def unlink(self):
+        user_ids = self.mapped('user_id').ids
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        self.env['peepl.weekly.report'].sudo()._reattribute_departments(user_ids)
         return result
 
-    def _update_pic_overview(self):
+    def _update_report_departments(self, extra_user_ids=None):
+        """Re-attribute weekly reports of the affected users to their current department and division"""
+        user_ids = set(self.mapped('user_id').ids) | set(extra_user_ids or [])
+        self.env['peepl.weekly.report'].sudo()._reattribute_departments(user_ids)
+
+    def _update_pic_overview(self, extra_user_ids=None):
         """Update PIC overview with sudo to bypass permission issues"""
-        self.env['peepl.pic.overview'].sudo().update_all_stats()
+        user_ids = set(self.mapped('user_id').ids) | set(extra_user_ids or [])
+        self.env['peepl.pic.overview'].sudo()._process_assignment_changes(user_ids)
 
     def sync_all_assignments(self):
         assignments = self.search([('active', '=', True)])
@@ -228,38 +291,28 @@ class PeeplUserAssignment(models.Model):
 
     @api.depends_context('uid')
     def _compute_allowed_departments(self):
+        profile = self._get_access_profile()
+        if profile.is_bod:
+            allowed_departments = self.env['hr.department'].sudo().search([])
+        elif profile.is_supervisor or profile.is_manager:
+            # Supervisor/Manager: same department only
+            allowed_departments = self.env['hr.department'].browse(profile.department_id)
+        else:
+            allowed_departments = self.env['hr.department']
         for record in self:
-            current_user = self.env.user
-            
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                record.allowed_department_ids = self.env['hr.department'].sudo().search([])
-            elif current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                # Supervisor: same department only
-                supervisor_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
-                if supervisor_assignment and supervisor_assignment.department_id:
-                    record.allowed_department_ids = supervisor_assignment.department_id
-                else:
-                    record.allowed_department_ids = self.env['hr.department']
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
-                manager_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
-                if manager_assignment and manager_assignment.department_id:
-                    record.allowed_department_ids = manager_assignment.department_id
-                else:
-                    record.allowed_department_ids = self.env['hr.department']
-            else:
-                record.allowed_department_ids = self.env['hr.department']
+            record.allowed_department_ids = allowed_departments
 
     @api.depends_context('uid')
     def _compute_allowed_jobs(self):
+        profile = self._get_access_profile()
+        if profile.is_bod:
+            allowed_jobs = self.env['hr.job'].sudo().search([])
+        elif profile.is_manager or profile.is_supervisor:
+            allowed_jobs = self.env['hr.job'].sudo().search([('name', 'not ilike', 'manager'), ('name', 'not ilike', 'bod')])
+        else:
+            allowed_jobs = self.env['hr.job']
         for record in self:
-            current_user = self.env.user
-            
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                record.allowed_job_ids = self.env['hr.job'].sudo().search([])
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                record.allowed_job_ids = self.env['hr.job'].sudo().search([('name', 'not ilike', 'manager'), ('name', 'not ilike', 'bod')])
-            else:
-                record.allowed_job_ids = self.env['hr.job']
+            record.allowed_job_ids = allowed_jobs
 
     @api.depends_context('uid', 'default_department_id')
     def _compute_allowed_users(self):
@@ -269,6 +322,7 @@ class PeeplUserAssignment(models.Model):
         for record in self:
             try:
                 current_user = self.env.user
+                profile = self._get_access_profile()
                 assigned_user_ids = self.sudo().search([('active', '=', True)]).mapped('user_id').ids
                 
                 # Check if we're in department configuration context
@@ -282,21 +336,20 @@ class PeeplUserAssignment(models.Model):
                         ('user_id', 'not in', assigned_user_ids)
                     ])
                     record.allowed_user_ids = dept_employees.mapped('user_id')
-                elif current_user.has_group('peepl_weekly_report.group_peepl_bod'):
+                elif profile.is_bod:
                     record.allowed_user_ids = self.env['res.users'].sudo().search([('id', 'not in', assigned_user_ids)])
-                elif current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
+                elif profile.is_supervisor:
                     # Supervisor: only users from same department (not division)
-                    supervisor_assignment = self.sudo().search([('user_id', '=', current_user.id), ('active', '=', True)], limit=1)
-                    if supervisor_assignment and supervisor_assignment.department_id:
+                    if profile.department_id:
                         dept_employees = self.env['hr.employee'].sudo().search([
-                            ('department_id', '=', supervisor_assignment.department_id.id),
+                            ('department_id', '=', profile.department_id),
                             ('user_id', '!=', False),
                             ('user_id', 'not in', assigned_user_ids)
                         ])
                         record.allowed_user_ids = dept_employees.mapped('user_id')
                     else:
                         record.allowed_user_ids = self.env['res.users']
-                elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
+                elif profile.is_manager:
                     manager_employee = self.env['hr.employee'].sudo().search([('user_id', '=', current_user.id)], limit=1)
                     if manager_employee and manager_employee.department_id:
                         # Optimized: get all employees from same department at once
@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+import logging
+from collections import Counter
+
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL, html2plaintext
 from datetime import date
 
+_logger = logging.getLogger(__name__)
+
+NUMBER_SEQUENCE = 'peepl_weekly_report_number_seq'
+# Fields whose changes alter the facets (deadline recomputes the status)
+FACET_FIELDS = ['pic_id', 'department_id', 'division_id', 'status', 'deadline']
+
 class PeeplWeeklyReport(models.Model):
     _name = 'peepl.weekly.report'
     _description = 'Peepl Weekly Report'
-    _inherit = ['peepl.field.template.mixin']
+    _inherit = ['peepl.field.template.mixin', 'peepl.facet.mixin']
     _rec_name = 'project_task'
     _order = 'name asc'
     
@@ -26,27 +36,30 @@ class PeeplWeeklyReport(models.Model):
     @api.depends('name', 'department_id')
     def _compute_display_number(self):
         """Compute display number based on user role"""
-        current_user = self.env.user
+        profile = self.env['peepl.user.assignment']._get_access_profile()
         
         # BOD: show actual number
-        if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
+        if profile.is_bod:
             for record in self:
                 record.display_number = record.name
         else:
             # Manager/Staff: show sequential number per department
-            assignment = self.env['peepl.user.assignment'].search([
-                ('user_id', '=', current_user.id),
-                ('active', '=', True)
-            ], limit=1)
-            
-            if assignment and assignment.department_id:
-                # Get all reports from same department, ordered by name
-                dept_reports = self.search([
-                    ('department_id', '=', assignment.department_id.id)
-                ], order='name asc')
-                
-                # Create mapping of actual number to display number
-                number_map = {report.id: idx + 1 for idx, report in enumerate(dept_reports)}
+            record_ids = tuple(record_id for record_id in self.ids if isinstance(record_id, int))
+            if profile.department_id and record_ids:
+                # Rank visible department reports by name in SQL, only fetch the requested ids
+                self.flush_model(['name', 'department_id'])
+                visible = self._search([('department_id', '=', profile.department_id)])
+                self.env.cr.execute(SQL("""
+                    SELECT id, display_number
+                      FROM (
+                            SELECT wr.id,
+                                   ROW_NUMBER() OVER (PARTITION BY wr.department_id ORDER BY wr.name) AS display_number
+                              FROM peepl_weekly_report wr
+                             WHERE wr.id IN %s
+                      ) ranked
+                     WHERE id IN %s
+                """, visible.subselect(), record_ids))
+                number_map = dict(self.env.cr.fetchall())
                 
                 for record in self:
                     record.display_number = number_map.get(record.id, record.name)
@@ -54,21 +67,13 @@ class PeeplWeeklyReport(models.Model):
                 for record in self:
                     record.display_number = record.name
     
-    def copy(self, default=None):
-        if default is None:
-            default = {}
-        # Pastikan nomor unik saat duplikat
-        new_number = self._get_next_number()
-        while self.search([('name', '=', new_number)]):
-            new_number += 1
-        default['name'] = new_number
-        return super().copy(default)
     pic_id = fields.Many2one('res.users', string='PIC', required=True)
     allowed_pic_ids = fields.Many2many('res.users', compute='_compute_allowed_pic_ids')
     allowed_user_ids = fields.Many2many('res.users', compute='_compute_allowed_users')
     department_filter_ids = fields.Many2many('hr.department', string='Department Filter', compute='_compute_department_filter')
     department_id = fields.Many2one('hr.department', string='Department', compute='_compute_department', store=True)
-    project_task = fields.Text(string='Project / Task', required=True)
+    division_id = fields.Many2one('peepl.division', string='Division', compute='_compute_department', store=True, index=True)
+    project_task = fields.Text(string='Project / Task', required=True, index='trigram')
     deadline = fields.Date(string='Deadline')
     status = fields.Selection([
         ('completed', 'Completed'),
@@ -78,9 +83,25 @@ class PeeplWeeklyReport(models.Model):
         ('plan', 'Plan'),
         ('overdue', 'Overdue'),
     ], string='Status', required=True, default='not_started', compute='_compute_status', store=True, readonly=False, group_expand='_group_expand_status')
+    effective_status = fields.Selection(
+        selection=lambda self: self._fields['status'].selection,
+        string='Effective Status',
+        compute='_compute_effective_status',
+        search='_search_effective_status',
+    )
     progress = fields.Integer(string='Progress (%)', default=0)
     notes = fields.Html(string='Notes')
+    custom_properties = fields.Properties(
+        string='Custom Fields',
+        definition='department_id.weekly_report_properties_definition',
+        copy=True,
+    )
     notes_decoded = fields.Html(string='Notes Decoded', compute='_compute_notes_decoded')
+    notes_plain = fields.Text(string='Notes (Plain Text)', compute='_compute_notes_plain', store=True, index='trigram')
+    text_search = fields.Char(string='Search', compute='_compute_text_search', search='_search_text_search')
+
+    # Backstop for the allocator (see _allocate_numbers); also serves lookups by number
+    _name_unique = models.Constraint('UNIQUE(name)', 'Report numbers must be unique.')
     
     @api.depends('notes')
     def _compute_notes_decoded(self):
@@ -97,47 +118,163 @@ class PeeplWeeklyReport(models.Model):
             else:
                 record.notes_decoded = ''
 
+    @api.depends('notes')
+    def _compute_notes_plain(self):
+        for record in self:
+            record.notes_plain = html2plaintext(record.notes) if record.notes else False
+
+    def _compute_text_search(self):
+        self.text_search = False
+
+    def _search_text_search(self, operator, value):
+        # Unaware of the rest of the domain: match words or substrings alike
+        # (see _search_text to pick the best strategy within a domain)
+        if operator != 'ilike':
+            raise ValidationError(f"Unsupported operator {operator} on search.")
+        self.flush_model(['project_task', 'notes_plain'])
+        words = self._search([])
+        words.add_where(SQL("%s @@ websearch_to_tsquery('simple', %s)",
+                            SQL(self._get_text_search_vector_sql(words.table)), value))
+        return ['|', ('id', 'in', words), '|', ('project_task', 'ilike', value), ('notes_plain', 'ilike', value)]
+
     @api.constrains('pic_id')
     def _check_pic_department(self):
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            return
+        department_by_pic = self._get_pic_departments(self.pic_id.ids)
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                continue
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                manager_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                
-                pic_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', record.pic_id.id),
-                    ('active', '=', True)
-                ], limit=1)
-                
-                if manager_assignment and pic_assignment:
-                    if manager_assignment.department_id != pic_assignment.department_id:
-                        raise ValidationError(f"Manager can only assign tasks to users in the same department ({manager_assignment.department_id.name}).")
-            elif current_user.has_group('peepl_weekly_report.group_peepl_staff'):
-                if record.pic_id != current_user:
-                    raise ValidationError("Staff can only assign tasks to themselves.")
+            error = self._get_pic_error(profile, record.pic_id.id, department_by_pic.get(record.pic_id.id))
+            if error:
+                raise ValidationError(error)
+
+    @api.model
+    def _get_pic_departments(self, pic_ids):
+        """Return {pic_id: department_id} of the first active assignment of the PICs, in one query"""
+        assignments = self.env['peepl.user.assignment'].sudo().search([
+            ('user_id', 'in', list(pic_ids)),
+            ('active', '=', True)
+        ], order='id')
+        department_by_pic = {}
+        for assignment in assignments:
+            department_by_pic.setdefault(assignment.user_id.id, assignment.department_id.id)
+        return department_by_pic
+
+    @api.model
+    def _get_pic_error(self, profile, pic_id, pic_department_id):
+        """Return why the current user may not assign ``pic_id``, or False.
+
+        ``pic_department_id`` is the department of the PIC's active
+        assignment, ``None`` when the PIC has no active assignment.
+        """
+        if profile.is_bod:
+            return False
+        if profile.is_manager or profile.is_supervisor:
+            if profile.assignment_id and pic_department_id is not None and pic_department_id != profile.department_id:
+                department = self.env['hr.department'].browse(profile.department_id)
+                return f"Manager can only assign tasks to users in the same department ({department.name})."
+        elif profile.is_staff and pic_id != self.env.uid:
+            return "Staff can only assign tasks to themselves."
+        return False
+
+    def init(self):
+        super().init()
+        # Per-department numbering and listing walk reports by name within a department
+        tools.create_index(self.env.cr, 'peepl_weekly_report_department_id_name_index',
+                           self._table, ['department_id', 'name'])
+        # Full-text search over the project/task and the notes (see _get_text_search_vector_sql)
+        tools.create_index(self.env.cr, 'peepl_weekly_report_text_search_index',
+                           self._table, [self._get_text_search_vector_sql()], 'gin')
+        # Containment searches on template values stored as properties
+        tools.create_index(self.env.cr, 'peepl_weekly_report_custom_properties_index',
+                           self._table, ['custom_properties'], 'gin')
+        # Free numbers below the highest report number, filled first by _allocate_numbers
+        if not tools.table_exists(self.env.cr, 'peepl_weekly_report_number_gap'):
+            self.env.cr.execute("""
+                CREATE TABLE peepl_weekly_report_number_gap (number integer PRIMARY KEY)
+            """)
+            self.env.cr.execute("""
+                INSERT INTO peepl_weekly_report_number_gap (number)
+                SELECT n
+                  FROM generate_series(1, (SELECT COALESCE(MAX(name), 0) FROM peepl_weekly_report)) n
+                 WHERE NOT EXISTS (SELECT 1 FROM peepl_weekly_report WHERE name = n)
+            """)
+        # Highest number handed out so far; sequences are not rolled back by
+        # concurrent transactions, unlike MAX(name) read from a snapshot
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {NUMBER_SEQUENCE} MINVALUE 0 START 1")
+        self.env.cr.execute(f"""
+            SELECT setval('{NUMBER_SEQUENCE}', GREATEST(
+                (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {NUMBER_SEQUENCE}),
+                (SELECT COALESCE(MAX(name), 0) FROM peepl_weekly_report)
+            ))
+        """)
+
+    def _lock_numbers(self):
+        """Serialize number allocation until the end of the transaction"""
+        self.env.cr.execute("SELECT pg_advisory_xact_lock(hashtext('peepl_weekly_report_number'))")
+
+    def _get_number_top(self):
+        """Return the highest report number handed out so far"""
+        self.env.cr.execute(f"SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {NUMBER_SEQUENCE}")
+        return self.env.cr.fetchone()[0]
+
     def _get_next_number(self):
-        # Cari nomor yang hilang terlebih dahulu - bypass record rules untuk dapat nomor global
-        existing_numbers = self.sudo().search([]).mapped('name')
-        if not existing_numbers:
-            return 1
-        
-        # Cari gap/nomor yang hilang
-        existing_numbers.sort()
-        for i in range(1, max(existing_numbers) + 1):
-            if i not in existing_numbers:
-                return i
-        
-        # Jika tidak ada gap, gunakan nomor berikutnya
-        next_num = max(existing_numbers) + 1
-        # Pastikan nomor unik
-        while next_num in existing_numbers:
-            next_num += 1
-        return next_num
+        """Return the number the next report will get, without reserving it"""
+        self.env.cr.execute("SELECT MIN(number) FROM peepl_weekly_report_number_gap")
+        gap = self.env.cr.fetchone()[0]
+        if gap:
+            return gap
+        return self._get_number_top() + 1
+
+    def _allocate_numbers(self, count):
+        """Reserve ``count`` global report numbers, lowest free numbers first"""
+        if count <= 0:
+            return []
+        self.flush_model(['name'])
+        self._lock_numbers()
+        self.env.cr.execute("""
+            DELETE FROM peepl_weekly_report_number_gap
+             WHERE number IN (
+                   SELECT number FROM peepl_weekly_report_number_gap ORDER BY number LIMIT %s
+             )
+         RETURNING number
+        """, [count])
+        numbers = sorted(number for number, in self.env.cr.fetchall())
+        if len(numbers) < count:
+            self.env.cr.execute(f"SELECT nextval('{NUMBER_SEQUENCE}') FROM generate_series(1, %s)",
+                                [count - len(numbers)])
+            numbers += sorted(number for number, in self.env.cr.fetchall())
+        return numbers
+
+    def _reserve_numbers(self, numbers):
+        """Take explicitly given numbers out of the free gaps.
+
+        Numbers skipped between the highest number and a given one become
+        gaps, so the allocator still fills them.
+        """
+        self.flush_model(['name'])
+        self._lock_numbers()
+        top = self._get_number_top()
+        if max(numbers) > top:
+            self.env.cr.execute("""
+                INSERT INTO peepl_weekly_report_number_gap (number)
+                SELECT n FROM generate_series(%s, %s) n
+                ON CONFLICT DO NOTHING
+            """, [top + 1, max(numbers) - 1])
+            self.env.cr.execute(f"SELECT setval('{NUMBER_SEQUENCE}', %s)", [max(numbers)])
+        self.env.cr.execute("DELETE FROM peepl_weekly_report_number_gap WHERE number = ANY(%s)", [list(numbers)])
+
+    def _release_numbers(self, numbers):
+        """Record the numbers of deleted reports as free gaps"""
+        self.flush_model(['name'])
+        self._lock_numbers()
+        self.env.cr.execute("""
+            INSERT INTO peepl_weekly_report_number_gap (number)
+            SELECT n
+              FROM unnest(%s) n
+             WHERE NOT EXISTS (SELECT 1 FROM peepl_weekly_report WHERE name = n)
+            ON CONFLICT DO NOTHING
+        """, [list(numbers)])
 
     def action_save_close(self):
         dept_filter = self.env.context.get('dept_filter')
@@ -168,19 +305,59 @@ class PeeplWeeklyReport(models.Model):
 
     @api.depends('pic_id')
     def _compute_department(self):
+        # One assignment query for the whole batch; the first active assignment wins
+        assignments = self.env['peepl.user.assignment'].sudo().search([
+            ('user_id', 'in', self.pic_id.ids),
+            ('active', '=', True)
+        ], order='id')
+        assignment_by_user = {}
+        for assignment in assignments:
+            assignment_by_user.setdefault(assignment.user_id.id, assignment)
         for record in self:
-            if record.pic_id:
-                assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', record.pic_id.id),
-                    ('active', '=', True)
-                ], limit=1)
-                record.department_id = assignment.department_id.id if assignment else False
-            else:
-                record.department_id = False
+            assignment = assignment_by_user.get(record.pic_id.id)
+            record.department_id = assignment.department_id.id if assignment else False
+            record.division_id = assignment.division_id.id if assignment else False
+
+    def _reattribute_departments(self, user_ids=None):
+        """Align department_id and division_id of all reports (or those of ``user_ids``) with the PIC's first active assignment"""
+        if user_ids is not None and not user_ids:
+            return []
+        self.env['peepl.user.assignment'].flush_model(['user_id', 'department_id', 'division_id', 'active'])
+        self.flush_model(['pic_id', 'department_id', 'division_id'])
+        where = 'TRUE'
+        params = {}
+        if user_ids is not None:
+            where = 'wr.pic_id = ANY(%(user_ids)s)'
+            params['user_ids'] = list(user_ids)
+        self.env.cr.execute(f"""
+            UPDATE peepl_weekly_report wr
+               SET department_id = target.department_id,
+                   division_id = target.division_id
+              FROM (
+                    SELECT wr.id, first.department_id, first.division_id
+                      FROM peepl_weekly_report wr
+                      LEFT JOIN (
+                            SELECT DISTINCT ON (user_id) user_id, department_id, division_id
+                              FROM peepl_user_assignment
+                             WHERE active
+                             ORDER BY user_id, id
+                      ) first ON first.user_id = wr.pic_id
+                     WHERE {where}
+              ) target
+             WHERE wr.id = target.id
+               AND (wr.department_id IS DISTINCT FROM target.department_id
+                    OR wr.division_id IS DISTINCT FROM target.division_id)
+         RETURNING wr.id
+        """, params)
+        report_ids = [row[0] for row in self.env.cr.fetchall()]
+        if report_ids:
+            self.invalidate_model(['department_id', 'division_id'])
+            self._bump_facet_version()
+        return report_ids
 
     @api.depends('deadline', 'status')
     def _compute_status(self):
-        today = date.today()
+        today = self._get_company_today()
         for record in self:
             # Skip if manually set to completed
             if record.status == 'completed':
@@ -194,16 +371,133 @@ class PeeplWeeklyReport(models.Model):
                 record.status = 'delayed'
 
     @api.model
-    def update_overdue_status(self):
-        """Cron job to update overdue status daily"""
-        today = date.today()
-        overdue_reports = self.search([
-            ('deadline', '<', today),
-            ('status', '!=', 'completed'),
-            ('status', '!=', 'overdue')
-        ])
-        overdue_reports.write({'status': 'overdue'})
-        return len(overdue_reports)
+    def _get_status_mode(self):
+        """Return how 'overdue' is determined.
+
+        ``stored`` (default) persists it through ``_compute_status`` and the
+        daily cron; ``effective`` derives it from ``deadline`` when reading and
+        searching ``effective_status``, so no nightly rewrite is needed.
+        """
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'peepl_weekly_report.status_mode', 'stored')
+
+    @api.model
+    def _get_effective_status_sql(self, alias='wr', today='CURRENT_DATE'):
+        """Return the SQL expression of the effective status of the reports aliased ``alias``"""
+        if self._get_status_mode() != 'effective':
+            return f"{alias}.status"
+        return f"""(CASE WHEN {alias}.status NOT IN ('completed', 'overdue') AND {alias}.deadline < {today}
+                          THEN 'overdue' ELSE {alias}.status END)"""
+
+    @api.depends('status', 'deadline')
+    def _compute_effective_status(self):
+        if self._get_status_mode() != 'effective':
+            for record in self:
+                record.effective_status = record.status
+            return
+        today = self._get_company_today()
+        for record in self:
+            if record.status not in ('completed', 'overdue') and record.deadline and record.deadline < today:
+                record.effective_status = 'overdue'
+            else:
+                record.effective_status = record.status
+
+    def _search_effective_status(self, operator, value):
+        if operator not in ('=', '!=', 'in', 'not in'):
+            raise ValidationError(f"Unsupported operator {operator} on effective status.")
+        if self._get_status_mode() != 'effective':
+            return [('status', operator, value)]
+        statuses = [value] if operator in ('=', '!=') else list(value)
+        today = self._get_company_today()
+        domain = []
+        for status in statuses:
+            if status == 'overdue':
+                clause = ['|', ('status', '=', 'overdue'),
+                          '&', ('status', '!=', 'completed'), ('deadline', '<', today)]
+            elif status == 'completed':
+                clause = [('status', '=', 'completed')]
+            else:
+                clause = ['&', ('status', '=', status),
+                          '|', ('deadline', '=', False), ('deadline', '>=', today)]
+            domain = (['|'] + domain + clause) if domain else clause
+        if not domain:
+            domain = [(0, '=', 1)]
+        if operator in ('!=', 'not in'):
+            domain = ['!'] + domain
+        return domain
+
+    @api.model
+    def _get_company_today(self):
+        """Return today's date in the company timezone"""
+        tz = self.env.company.partner_id.tz or 'UTC'
+        return fields.Date.context_today(self.with_context(tz=tz))
+
+    @api.model
+    def update_overdue_status(self, batch_size=None, auto_commit=True):
+        """Cron job to update overdue status daily.
+
+        Reports are switched in chunks of ``batch_size`` rows
+        (``peepl_weekly_report.overdue_batch_size``, 1000 by default), each
+        committed on its own: a run interrupted by a timeout leaves finished
+        chunks in place and the next run picks up the remaining rows.
+        Returns the number of reports changed per department id.
+        """
+        if self._get_status_mode() == 'effective':
+            # Nothing to rewrite: only the day rollover has to reach the overview counts
+            overview = self.env['peepl.pic.overview'].sudo()
+            if overview._get_maintenance_mode() == 'materialized':
+                self.env['peepl.pic.overview.snapshot'].sudo()._refresh()
+            else:
+                overview.update_all_stats()
+            return {}
+        if batch_size is None:
+            batch_size = int(self.env['ir.config_parameter'].sudo().get_param(
+                'peepl_weekly_report.overdue_batch_size', 1000))
+        today = self._get_company_today()
+        overview = self.env['peepl.pic.overview'].sudo()
+        self.flush_model(['deadline', 'status'])
+        changed = Counter()
+        while True:
+            self.env.cr.execute("""
+                WITH batch AS (
+                    SELECT id, status
+                      FROM peepl_weekly_report
+                     WHERE deadline < %(today)s
+                       AND status NOT IN ('completed', 'overdue')
+                     ORDER BY id
+                     LIMIT %(limit)s
+                       FOR UPDATE SKIP LOCKED
+                )
+                UPDATE peepl_weekly_report wr
+                   SET status = 'overdue',
+                       write_date = (now() at time zone 'UTC'),
+                       write_uid = %(uid)s
+                  FROM batch
+                 WHERE wr.id = batch.id
+             RETURNING wr.pic_id, wr.department_id, batch.status, wr.progress
+            """, {'today': today, 'limit': batch_size, 'uid': self.env.uid})
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            self.invalidate_model(['status', 'write_date', 'write_uid'])
+            self._bump_facet_version()
+            # Only the PICs of this chunk get their overview rows adjusted
+            overview._process_report_changes(
+                before=[(pic_id, status, progress) for pic_id, _dept, status, progress in rows],
+                after=[(pic_id, 'overdue', progress) for pic_id, _dept, _status, progress in rows],
+            )
+            changed.update(department_id for _pic, department_id, _status, _progress in rows)
+            if auto_commit:
+                self.env.cr.commit()
+            if len(rows) < batch_size:
+                break
+        if changed:
+            Department = self.env['hr.department'].sudo()
+            _logger.info("Marked %s weekly reports overdue: %s", sum(changed.values()), ", ".join(
+                f"{Department.browse(dept_id).name if dept_id else 'No Department'}: {count}"
+                for dept_id, count in changed.items()
+            ))
+        return dict(changed)
 
     @api.onchange('status')
     def _onchange_status(self):
@@ -224,8 +518,15 @@ class PeeplWeeklyReport(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
+        given = [vals['name'] for vals in vals_list if vals.get('name')]
+        if given:
+            self._reserve_numbers(given)
+        missing = [vals for vals in vals_list if not vals.get('name')]
+        for vals, number in zip(missing, self._allocate_numbers(len(missing))):
+            vals['name'] = number
         records = super().create(vals_list)
-        self._update_pic_overview()
+        records._update_pic_overview(before=[], after=records._get_overview_snapshot())
+        self._bump_facet_version()
         return records
 
     def write(self, vals):
@@ -244,19 +545,39 @@ class PeeplWeeklyReport(models.Model):
                 if record.status == 'overdue' and vals['status'] not in ['completed', 'delayed']:
                     vals['status'] = 'overdue'
         
+        renumber = bool(vals.get('name'))
+        if renumber:
+            old_numbers = set(self.sudo().mapped('name')) - {vals['name']}
+            self._reserve_numbers([vals['name']])
+
+        # Deadline changes may recompute the status
+        track_overview = any(field in vals for field in ['progress', 'pic_id', 'status', 'deadline'])
+        before = self._get_overview_snapshot() if track_overview else []
         result = super().write(vals)
-        if any(field in vals for field in ['progress', 'pic_id', 'status']):
-            self._update_pic_overview()
+        if any(field in vals for field in FACET_FIELDS):
+            self._bump_facet_version()
+        if renumber:
+            self._release_numbers(old_numbers)
+        if track_overview:
+            self._update_pic_overview(before=before, after=self._get_overview_snapshot())
         return result
 
     def unlink(self):
+        before = self._get_overview_snapshot()
+        numbers = self.sudo().mapped('name')
         result = super().unlink()
-        self._update_pic_overview()
+        self._bump_facet_version()
+        self.env['peepl.weekly.report']._release_numbers(numbers)
+        self.env['peepl.weekly.report']._update_pic_overview(before=before, after=[])
         return result
 
-    def _update_pic_overview(self):
-        """Update PIC overview"""
-        self.env['peepl.pic.overview'].update_all_stats()
+    def _get_overview_snapshot(self):
+        """Return the (pic_id, effective status, progress) tuples counted by the PIC overview"""
+        return [(record.pic_id.id, record.effective_status, record.progress) for record in self.sudo()]
+
+    def _update_pic_overview(self, before=None, after=None):
+        """Update PIC overview, incrementally when snapshots are given"""
+        self.env['peepl.pic.overview'].sudo()._process_report_changes(before, after)
 
     @api.constrains('progress')
     def _check_progress(self):
@@ -266,49 +587,33 @@ class PeeplWeeklyReport(models.Model):
 
     @api.depends('create_uid')
     def _compute_department_filter(self):
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            # BOD: all departments
+            departments = self.env['hr.department'].search([])
+        elif profile.is_manager or profile.is_supervisor:
+            # Manager/Supervisor: only their department
+            departments = self.env['hr.department'].browse(profile.department_id)
+        else:
+            # Staff: no department filter needed
+            departments = self.env['hr.department']
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                # BOD: all departments
-                record.department_filter_ids = self.env['hr.department'].search([])
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                # Manager/Supervisor: only their department
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.department_id:
-                    record.department_filter_ids = user_assignment.department_id
-                else:
-                    record.department_filter_ids = self.env['hr.department']
-            else:
-                # Staff: no department filter needed
-                record.department_filter_ids = self.env['hr.department']
+            record.department_filter_ids = departments
 
     @api.depends('create_uid')
     def _compute_allowed_users(self):
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            # BOD: all users
+            users = self.env['res.users'].search([])
+        elif profile.is_manager or profile.is_supervisor:
+            # Manager/Supervisor: only users from same department
+            users = self.env['res.users'].browse(profile.department_user_ids)
+        else:
+            # Staff: only themselves
+            users = self.env.user
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                # BOD: all users
-                record.allowed_user_ids = self.env['res.users'].search([])
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                # Manager/Supervisor: only users from same department
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                if user_assignment:
-                    dept_assignments = self.env['peepl.user.assignment'].search([
-                        ('department_id', '=', user_assignment.department_id.id),
-                        ('active', '=', True)
-                    ])
-                    record.allowed_user_ids = dept_assignments.mapped('user_id')
-                else:
-                    record.allowed_user_ids = self.env['res.users']
-            else:
-                # Staff: only themselves
-                record.allowed_user_ids = current_user
+            record.allowed_user_ids = users
 
     @api.model
     def _group_expand_status(self, statuses, domain):
@@ -317,129 +622,33 @@ class PeeplWeeklyReport(models.Model):
 
     @api.depends('create_uid', 'department_id')
     def _compute_allowed_pic_ids(self):
+        Assignment = self.env['peepl.user.assignment']
+        profile = Assignment._get_access_profile()
+        users_by_department = {}
         for record in self:
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
-                # BOD: filter by selected department if exists
-                if record.department_id:
-                    dept_assignments = self.env['peepl.user.assignment'].search([
-                        ('department_id', '=', record.department_id.id),
-                        ('active', '=', True)
-                    ])
-                    record.allowed_pic_ids = dept_assignments.mapped('user_id')
-                else:
-                    # No department selected: show all users
-                    assigned_users = self.env['peepl.user.assignment'].search([('active', '=', True)]).mapped('user_id')
-                    record.allowed_pic_ids = assigned_users
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager') or current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
+            if profile.is_bod:
+                # BOD: filter by selected department if exists, else all assigned users
+                department_id = record.department_id.id
+                if department_id not in users_by_department:
+                    domain = [('active', '=', True)]
+                    if department_id:
+                        domain.append(('department_id', '=', department_id))
+                    users_by_department[department_id] = Assignment.search(domain).mapped('user_id')
+                record.allowed_pic_ids = users_by_department[department_id]
+            elif profile.is_manager or profile.is_supervisor:
                 # Manager/Supervisor: only users from same department
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id),
-                    ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.department_id:
-                    dept_assignments = self.env['peepl.user.assignment'].search([
-                        ('department_id', '=', user_assignment.department_id.id),
-                        ('active', '=', True)
-                    ])
-                    record.allowed_pic_ids = dept_assignments.mapped('user_id')
-                else:
-                    record.allowed_pic_ids = self.env['res.users']
+                record.allowed_pic_ids = self.env['res.users'].browse(profile.department_user_ids)
             else:
                 # Staff: only themselves
-                record.allowed_pic_ids = current_user
-
-    @api.model
-    def fields_view_get(self, view_id=None, view_type='form', toolbar=False, submenu=False):
-        """Override to inject department-specific fields in list and form view"""
-        result = super().fields_view_get(view_id, view_type, toolbar, submenu)
-        
-        # Debug logging
-        import logging
-        _logger = logging.getLogger(__name__)
-        _logger.info(f"fields_view_get called: view_type={view_type}, context={self.env.context}")
-        
-        if view_type in ['tree', 'form']:
-            try:
-                dept_id = self.env.context.get('dept_filter')
-                _logger.info(f"Department filter: {dept_id}")
-                
-                if dept_id:
-                    templates = self.env['peepl.field.template'].sudo().search([
-                        ('department_id', '=', dept_id),
-                        ('active', '=', True)
-                    ], order='sequence')
-                    _logger.info(f"Found {len(templates)} templates for dept {dept_id}")
-                    
-                    if templates:
-                        from lxml import etree
-                        doc = etree.fromstring(result['arch'])
-                        
-                        if view_type == 'form':
-                            # Try multiple approaches to inject fields
-                            notebook = doc.xpath('//notebook')
-                            if notebook:
-                                _logger.info("Found notebook, adding page")
-                                page_elem = etree.Element('page')
-                                page_elem.set('string', f'{self.env["hr.department"].browse(dept_id).name} Fields')
-                                
-                                group_elem = etree.Element('group')
-                                for template in templates:
-                                    fname = template._column_name()
-                                    _logger.info(f"Adding field: {fname}")
-                                    field_elem = etree.Element('field')
-                                    field_elem.set('name', fname)
-                                    field_elem.set('string', template.name)
-                                    field_elem.set('placeholder', f'[{template.department_id.name}] {template.name}')
-                                    group_elem.append(field_elem)
-                                
-                                page_elem.append(group_elem)
-                                notebook[0].append(page_elem)
-                            else:
-                                # Fallback: add to sheet
-                                _logger.info("No notebook found, adding to sheet")
-                                sheet = doc.xpath('//sheet')
-                                if sheet:
-                                    group_elem = etree.Element('group')
-                                    group_elem.set('string', f'{self.env["hr.department"].browse(dept_id).name} Fields')
-                                    for template in templates:
-                                        fname = template._column_name()
-                                        field_elem = etree.Element('field')
-                                        field_elem.set('name', fname)
-                                        field_elem.set('string', template.name)
-                                        field_elem.set('placeholder', f'[{template.department_id.name}] {template.name}')
-                                        group_elem.append(field_elem)
-                                    sheet[0].append(group_elem)
-                        
-                        elif view_type == 'tree':
-                            notes_field = doc.xpath('//field[@name="notes"]')
-                            if notes_field:
-                                parent = notes_field[0].getparent()
-                                notes_index = list(parent).index(notes_field[0])
-                                
-                                for i, template in enumerate(templates):
-                                    fname = template._column_name()
-                                    field_elem = etree.Element('field')
-                                    field_elem.set('name', fname)
-                                    field_elem.set('string', template.name)
-                                    field_elem.set('optional', 'show')
-                                    
-                                    parent.insert(notes_index + 1 + i, field_elem)
-                        
-                        result['arch'] = etree.tostring(doc, encoding='unicode')
-                        _logger.info("Updated arch with dynamic fields")
-            except Exception as e:
-                _logger.error(f"Error in fields_view_get: {e}")
-        
-        return result
+                record.allowed_pic_ids = self.env.user
 
     @api.model
     def action_weekly_report_with_dept_filter(self):
         """Action that automatically adds department filter for Manager/Staff users"""
-        current_user = self.env.user
+        profile = self.env['peepl.user.assignment']._get_access_profile()
         
         # Check if user is BOD - no filter needed
-        if current_user.has_group('peepl_weekly_report.group_peepl_bod'):
+        if profile.is_bod:
             return {
                 'type': 'ir.actions.client',
                 'tag': 'weekly_report_custom_view',
@@ -447,14 +656,9 @@ class PeeplWeeklyReport(models.Model):
             }
         
         # For Manager/Staff - get their department
-        assignment = self.env['peepl.user.assignment'].search([
-            ('user_id', '=', current_user.id),
-            ('active', '=', True)
-        ], limit=1)
-        
-        if assignment and assignment.department_id:
-            dept_id = assignment.department_id.id
-            dept_name = assignment.department_id.name
+        if profile.department_id:
+            dept_id = profile.department_id
+            dept_name = self.env['hr.department'].browse(dept_id).name
             
             return {
                 'type': 'ir.actions.client',
@@ -472,3 +676,268 @@ class PeeplWeeklyReport(models.Model):
             'tag': 'weekly_report_custom_view',
             'name': 'Weekly Reports',
         }
+
+    @api.model
+    def get_user_bootstrap(self):
+        """Return the caller's role, department, division and overview model in one call"""
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_bod:
+            role = 'bod'
+        elif profile.is_manager:
+            role = 'manager'
+        elif profile.is_supervisor:
+            role = 'supervisor'
+        elif profile.is_staff:
+            role = 'staff'
+        else:
+            role = False
+        department = self.env['hr.department'].sudo().browse(profile.department_id)
+        return {
+            'role': role,
+            'department_id': department.id or False,
+            'department_name': department.name or False,
+            'division_id': profile.division_id or False,
+            'overview_model': self.env['peepl.pic.overview'].get_overview_model(),
+        }
+
+    @api.model
+    def get_list_bootstrap(self, dept_id=False, name_filter=False, limit=20):
+        """Return role, department, dynamic fields and first page of the custom list view"""
+        result = self.get_user_bootstrap()
+        # Manager/Supervisor/Staff open their own department when none is given
+        if not dept_id and result['role'] in ('manager', 'supervisor', 'staff'):
+            dept_id = result['department_id']
+        dept_name = self.env['hr.department'].browse(dept_id).name if dept_id else False
+        dynamic_fields = self._get_list_dynamic_fields(dept_id)
+        result.update({
+            'dept_filter': dept_id or False,
+            'dept_name': dept_name,
+            'dynamic_fields': dynamic_fields,
+            **self._get_list_page(dept_id, name_filter, 0, limit, dynamic_fields),
+        })
+        return result
+
+    @api.model
+    def get_list_page(self, dept_id=False, name_filter=False, offset=0, limit=20, after=None, search=False):
+        """Return one page of the custom list view with its total, dynamic columns and PIC names.
+
+        ``after`` is the ``next_after`` key returned with the previous page:
+        rows are then sought after it and ``offset`` only numbers them.
+        ``search`` keeps the reports whose project/task or notes match it
+        (see ``_search_text``).
+        """
+        dynamic_fields = self._get_list_dynamic_fields(dept_id)
+        return {
+            'dynamic_fields': dynamic_fields,
+            **self._get_list_page(dept_id, name_filter, offset, limit, dynamic_fields, after, search),
+        }
+
+    @api.model
+    def _get_list_dynamic_fields(self, dept_id):
+        """Return the dynamic column definitions of ``dept_id`` that can be read from the model"""
+        if not dept_id:
+            return []
+        templates = self.env['peepl.field.template'].search([
+            ('department_id', '=', dept_id),
+            ('active', '=', True)
+        ], order='sequence')
+        return [{
+            'name': fname,
+            'label': template.name,
+            'type': template.field_type,
+            'anchor': template.anchor_field,
+            'position': template.position,
+            'sequence': template.sequence,
+        } for template in templates if self._is_template_fname((fname := template._column_name()))]
+
+    @api.model
+    def _get_list_page(self, dept_id, name_filter, offset, limit, dynamic_fields, after=None, search=False):
+        """Return one page of the custom list view with its total and PIC names.
+
+        Pages are ordered on ``(name, id)``; when ``after`` (the ``[name, id]``
+        of the previous page's last row) is given, the page is sought from it
+        through the ``name`` indexes, so deep pages cost the same as the first.
+        """
+        dept_domain = [('department_id', '=', dept_id)] if dept_id else []
+        domain = dept_domain + ([('pic_id.name', '=', name_filter)] if name_filter else [])
+        if search:
+            domain += [('id', 'in', self._search_text(search, domain))]
+        field_names = [
+            'name', 'pic_id', 'project_task', 'deadline',
+            'effective_status', 'progress', 'notes', 'department_id',
+        ] + self._get_template_read_fields([field['name'] for field in dynamic_fields])
+        page_domain = domain
+        if after:
+            last_name, last_id = after
+            page_domain = domain + ['|', ('name', '>', last_name), '&', ('name', '=', last_name), ('id', '>', last_id)]
+        records = self.with_context(dept_filter=dept_id).search_read(
+            page_domain, field_names, offset=0 if after else offset, limit=limit, order='name, id')
+        for index, record in enumerate(records):
+            record['display_number'] = offset + index + 1
+            record['status'] = record.pop('effective_status')
+            self._flatten_template_values(record)
+        pic_names = [facet['label'] for facet in self.get_facets(['pic_id'], dept_domain)['pic_id']]
+        return {
+            'records': records,
+            'total': self.search_count(domain),
+            'unique_names': pic_names,
+            'next_after': [records[-1]['name'], records[-1]['id']] if records else False,
+        }
+
+    @api.model
+    def _export_rows(self, dept_id=False, chunk_size=1000):
+        """Yield the export header, then one row per report visible to the user.
+
+        Reports are read in keyset chunks of ``chunk_size`` (``id > last id``)
+        and the cache is emptied after each chunk, so memory stays flat
+        whatever the number of rows. Record rules apply as usual.
+        """
+        reports = self.with_context(dept_filter=dept_id) if dept_id else self
+        template_fnames = list(reports._get_template_fname_map())
+        labels = self._get_template_labels()
+        status_labels = dict(self._fields['status'].selection)
+        yield [
+            'No', 'PIC', 'Department', 'Project / Task', 'Deadline', 'Status', 'Progress (%)', 'Notes',
+        ] + [labels.get(fname, fname) for fname in template_fnames]
+
+        domain = [('department_id', '=', dept_id)] if dept_id else []
+        read_fields = [
+            'name', 'pic_id', 'department_id', 'project_task', 'deadline',
+            'effective_status', 'progress', 'notes_plain',
+        ] + self._get_template_read_fields(template_fnames)
+        last_id = 0
+        while True:
+            chunk = reports.search_read(domain + [('id', '>', last_id)], read_fields, order='id', limit=chunk_size)
+            for values in chunk:
+                self._flatten_template_values(values)
+                yield [
+                    values['name'],
+                    self._export_cell(values['pic_id']),
+                    self._export_cell(values['department_id']),
+                    values['project_task'] or '',
+                    self._export_cell(values['deadline']),
+                    status_labels.get(values['effective_status'], ''),
+                    values['progress'],
+                    values['notes_plain'] or '',
+                ] + [self._export_cell(values.get(fname)) for fname in template_fnames]
+            if len(chunk) < chunk_size:
+                break
+            last_id = chunk[-1]['id']
+            self.env.invalidate_all()
+
+    @api.model
+    def _export_cell(self, value):
+        """Return ``value`` as read by the ORM in a CSV/XLSX friendly form"""
+        if isinstance(value, (list, tuple)):
+            return value[1] if len(value) > 1 else ''
+        if isinstance(value, date):
+            return fields.Date.to_string(value)
+        if value is False or value is None:
+            return ''
+        return value
+
+    @api.model
+    def import_reports(self, rows):
+        """Create many reports at once, reporting errors per row instead of failing the batch.
+
+        ``rows`` is a list of ``create`` values. PIC rules are validated for
+        the whole batch with a couple of queries, numbers are allocated as a
+        block and all valid rows are created by a single ``create``; if that
+        fails, rows are retried one by one to isolate the faulty ones. The
+        PIC overview is updated once, at commit. The PIC constraint still
+        runs on create, with one assignment query for all created reports.
+
+        Returns ``{'created': [{'row': index, 'id': id}], 'errors': [{'row': index, 'message': str}]}``.
+        """
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        pic_ids = {row['pic_id'] for row in rows if isinstance(row.get('pic_id'), int)}
+        existing_pic_ids = set(self.env['res.users'].sudo().browse(pic_ids).exists().ids)
+        department_by_pic = self._get_pic_departments(existing_pic_ids)
+
+        errors = {}
+        valid = []
+        for index, row in enumerate(rows):
+            missing = [fname for fname in ('pic_id', 'project_task') if not row.get(fname)]
+            if missing:
+                errors[index] = f"Missing required fields: {', '.join(missing)}."
+            elif row['pic_id'] not in existing_pic_ids:
+                errors[index] = f"PIC {row['pic_id']} does not exist."
+            elif not isinstance(progress := row.get('progress', 0), int) or isinstance(progress, bool):
+                errors[index] = "Progress must be an integer."
+            elif not 0 <= progress <= 100:
+                errors[index] = "Progress must be between 0 and 100."
+            elif error := self._get_pic_error(profile, row['pic_id'], department_by_pic.get(row['pic_id'])):
+                errors[index] = error
+            else:
+                valid.append((index, row))
+
+        # create() fills in 'name': always pass copies, so that retries
+        # allocate again instead of reusing numbers of the rolled back block
+        created = {}
+        try:
+            with self.env.cr.savepoint():
+                records = self.create([dict(row) for _index, row in valid])
+            created = dict(zip([index for index, _row in valid], records.ids))
+        except Exception:
+            for index, row in valid:
+                try:
+                    with self.env.cr.savepoint():
+                        created[index] = self.create([dict(row)]).id
+                except Exception as e:
+                    errors[index] = str(e)
+        return {
+            'created': [{'row': index, 'id': record_id} for index, record_id in sorted(created.items())],
+            'errors': [{'row': index, 'message': message} for index, message in sorted(errors.items())],
+        }
+
+    @api.model
+    def _get_text_search_vector_sql(self, alias=None):
+        """Return the full-text document of the reports aliased ``alias``.
+
+        It must stay identical to the expression indexed in ``init``.
+        """
+        prefix = f'"{alias}".' if alias else ''
+        return f"to_tsvector('simple', COALESCE({prefix}project_task, '') || ' ' || COALESCE({prefix}notes_plain, ''))"
+
+    @api.model
+    def _search_text(self, text, domain=None):
+        """Return the query of the reports matching ``text``, best matches first.
+
+        Words are matched with the GIN tsvector index over the project/task
+        and the plain text of the notes, ranked by ``ts_rank``. When no
+        report of ``domain`` matches, ``ILIKE`` through the trigram indexes finds partial
+        words instead, ranked by similarity when pg_trgm is available.
+        """
+        self.flush_model(['project_task', 'notes_plain'])
+        query = self._search(domain or [])
+        vector = SQL(self._get_text_search_vector_sql(query.table))
+        tsquery = SQL("websearch_to_tsquery('simple', %s)", text)
+        query.add_where(SQL("%s @@ %s", vector, tsquery))
+        self.env.cr.execute(SQL("SELECT EXISTS(%s)", query.select(SQL("1"))))
+        if self.env.cr.fetchone()[0]:
+            query.order = SQL("ts_rank(%s, %s) DESC, %s DESC", vector, tsquery, SQL.identifier(query.table, 'id'))
+            return query
+
+        query = self._search(list(domain or []) + ['|', ('project_task', 'ilike', text), ('notes_plain', 'ilike', text)])
+        if self.env.registry.has_trigram:
+            query.order = SQL(
+                "GREATEST(similarity(%s, %s), word_similarity(%s, %s)) DESC, %s DESC",
+                SQL.identifier(query.table, 'project_task'), text,
+                text, SQL.identifier(query.table, 'notes_plain'),
+                SQL.identifier(query.table, 'id'),
+            )
+        return query
+
+    @api.model
+    def search_reports(self, text, dept_id=False, offset=0, limit=20):
+        """Return the reports matching ``text`` in their project/task or notes, best matches first"""
+        domain = [('department_id', '=', dept_id)] if dept_id else []
+        query = self._search_text(text, domain)
+        query.offset = offset
+        query.limit = limit
+        records = self.browse(query).read([
+            'name', 'pic_id', 'department_id', 'project_task', 'deadline', 'effective_status', 'progress', 'notes_plain',
+        ])
+        for record in records:
+            record['status'] = record.pop('effective_status')
+        return records
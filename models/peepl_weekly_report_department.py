@@ -46,14 +46,17 @@ class PeeplWeeklyReportDepartment(models.Model):
         
         # Handle field_template_ids changes
         if 'field_template_ids' in vals:
+            # Applied as one batch: a single schema sync and registry reload
+            to_create, to_write, to_unlink = [], [], []
             for command in vals['field_template_ids']:
                 if command[0] == 2:  # Delete
-                    self.env['peepl.field.template'].browse(command[1]).unlink()
+                    to_unlink.append(command[1])
                 elif command[0] == 1:  # Update
-                    self.env['peepl.field.template'].browse(command[1]).write(command[2])
+                    to_write.append((command[1], command[2]))
                 elif command[0] == 0:  # Create
                     command[2]['department_id'] = self.department_id.id
-                    self.env['peepl.field.template'].create(command[2])
+                    to_create.append(command[2])
+            self.env['peepl.field.template']._apply_template_changes(to_create, to_write, to_unlink)
         
         # Handle user_assignment_ids changes
         if 'user_assignment_ids' in vals:
@@ -5,39 +5,57 @@ from odoo import models, api, fields
 class ResUsers(models.Model):
     _inherit = 'res.users'
     
-    # Computed field for record rules
+    # Stored access fields for record rules, maintained from active assignments
     weekly_report_department_ids = fields.Many2many(
         'hr.department',
+        'peepl_weekly_report_user_department_rel',
+        'user_id',
+        'department_id',
         compute='_compute_weekly_department_ids',
+        store=True,
         string='Weekly Report Departments'
     )
     weekly_report_division_ids = fields.Many2many(
         'peepl.division',
+        'peepl_weekly_report_user_division_rel',
+        'user_id',
+        'division_id',
         compute='_compute_weekly_division_ids',
+        store=True,
         string='Weekly Report Divisions'
     )
     user_assignment_ids = fields.One2many('peepl.user.assignment', 'user_id', string='User Assignments')
     
-    @api.depends_context('uid')
+    def _get_active_assignments_by_user(self):
+        """Return active assignments of the users in self, grouped by user"""
+        return self.env['peepl.user.assignment'].sudo().search([
+            ('user_id', 'in', self.ids),
+            ('active', '=', True)
+        ]).grouped('user_id')
+
+    @api.depends('user_assignment_ids.department_id', 'user_assignment_ids.active')
     def _compute_weekly_department_ids(self):
         """Compute user's departments for record rules"""
+        assignments_by_user = self._get_active_assignments_by_user()
         for user in self:
-            assignments = self.env['peepl.user.assignment'].sudo().search([
-                ('user_id', '=', user.id),
-                ('active', '=', True)
-            ])
+            assignments = assignments_by_user.get(user, self.env['peepl.user.assignment'])
             user.weekly_report_department_ids = assignments.mapped('department_id')
     
-    @api.depends_context('uid')
+    @api.depends('user_assignment_ids.division_id', 'user_assignment_ids.active')
     def _compute_weekly_division_ids(self):
         """Compute user's divisions for record rules"""
+        assignments_by_user = self._get_active_assignments_by_user()
         for user in self:
-            assignments = self.env['peepl.user.assignment'].sudo().search([
-                ('user_id', '=', user.id),
-                ('active', '=', True)
-            ])
+            assignments = assignments_by_user.get(user, self.env['peepl.user.assignment'])
             user.weekly_report_division_ids = assignments.mapped('division_id')
 
+    def write(self, vals):
+        result = super().write(vals)
+        if 'name' in vals:
+            # PIC names are labels of the cached facets
+            self.env['peepl.weekly.report']._bump_facet_version()
+        return result
+
     @api.model
     def name_search(self, name='', domain=None, operator='ilike', limit=100):
         # Filter by department from department configuration
@@ -52,51 +70,23 @@ class ResUsers(models.Model):
             allowed_user_ids = dept_employees.mapped('user_id').ids
             domain = (domain or []) + [('id', 'in', allowed_user_ids or [False])]
         elif self.env.context.get('from_weekly_report_pic'):
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id), ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.division_id:
-                    division_assignments = self.env['peepl.user.assignment'].search([
-                        ('division_id', '=', user_assignment.division_id.id), ('active', '=', True)
-                    ])
-                    allowed_user_ids = division_assignments.mapped('user_id').ids
-                    domain = (domain or []) + [('id', 'in', allowed_user_ids or [False])]
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id), ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.department_id:
-                    dept_assignments = self.env['peepl.user.assignment'].search([
-                        ('department_id', '=', user_assignment.department_id.id), ('active', '=', True)
-                    ])
-                    allowed_user_ids = dept_assignments.mapped('user_id').ids
-                    domain = (domain or []) + [('id', 'in', allowed_user_ids or [False])]
+            domain = (domain or []) + self._get_weekly_report_pic_domain()
         return super().name_search(name=name, domain=domain, operator=operator, limit=limit)
 
+    @api.model
+    def _get_weekly_report_pic_domain(self):
+        """Restrict PIC choices to the current user's division (supervisor) or department (manager)"""
+        profile = self.env['peepl.user.assignment']._get_access_profile()
+        if profile.is_supervisor:
+            if profile.division_id:
+                return [('id', 'in', list(profile.division_user_ids) or [False])]
+        elif profile.is_manager:
+            if profile.department_id:
+                return [('id', 'in', list(profile.department_user_ids) or [False])]
+        return []
+
     @api.model
     def search_read(self, domain=None, fields=None, offset=0, limit=None, order=None):
         if self.env.context.get('from_weekly_report_pic'):
-            current_user = self.env.user
-            if current_user.has_group('peepl_weekly_report.group_peepl_supervisor'):
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id), ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.division_id:
-                    division_assignments = self.env['peepl.user.assignment'].search([
-                        ('division_id', '=', user_assignment.division_id.id), ('active', '=', True)
-                    ])
-                    allowed_user_ids = division_assignments.mapped('user_id').ids
-                    domain = (domain or []) + [('id', 'in', allowed_user_ids or [False])]
-            elif current_user.has_group('peepl_weekly_report.group_peepl_manager'):
-                user_assignment = self.env['peepl.user.assignment'].search([
-                    ('user_id', '=', current_user.id), ('active', '=', True)
-                ], limit=1)
-                if user_assignment and user_assignment.department_id:
-                    dept_assignments = self.env['peepl.user.assignment'].search([
-                        ('department_id', '=', user_assignment.department_id.id), ('active', '=', True)
-                    ])
-                    allowed_user_ids = dept_assignments.mapped('user_id').ids
-                    domain = (domain or []) + [('id', 'in', allowed_user_ids or [False])]
+            domain = (domain or []) + self._get_weekly_report_pic_domain()
         return super().search_read(domain=domain, fields=fields, offset=offset, limit=limit, order=order)
\ No newline at end of file
@@ -16,6 +16,7 @@ export class PeeplDashboard extends Component {
             picData: [],
             filteredPicData: [],
             departments: [],
+            divisions: [],
             chartData: [],
             selectedDept: null,
             searchQuery: '',
@@ -63,105 +64,18 @@ export class PeeplDashboard extends Component {
         await this.loadAllData();
     }
 
-    async loadManagerData(departmentId) {
-        // Get users from same department
-        const assignments = await this.orm.searchRead(
-            "peepl.user.assignment",
-            [["department_id", "=", departmentId], ["active", "=", true]],
-            ["user_id", "department_id"]
-        );
-        
-        const userIds = assignments.map(a => a.user_id[0]);
-        
-        // Load PIC data for department users only
-        this.state.picData = await this.orm.searchRead(
-            "peepl.pic.overview",
-            [["user_id", "in", userIds]],
-            ["user_id", "job_position", "total_tasks", "completed", "in_progress", "not_started", "delayed", "plan", "overdue"]
-        );
-        
-        // Load department
-        this.state.departments = await this.orm.searchRead(
-            "hr.department",
-            [["id", "=", departmentId]],
-            ["name"]
-        );
-        
-        this.setupCommonData(assignments);
-    }
-
     async loadAllData() {
-        // Load all PIC data (filtered by record rules)
-        this.state.picData = await this.orm.searchRead(
-            "peepl.pic.overview",
-            [],
-            ["user_id", "job_position", "total_tasks", "completed", "in_progress", "not_started", "delayed", "plan", "overdue"]
-        );
-        
-        // Load all assignments with division (filtered by record rules)
-        const assignments = await this.orm.searchRead(
-            "peepl.user.assignment",
-            [["active", "=", true]],
-            ["user_id", "department_id", "division_id"]
-        );
-        
-        // Get unique departments from assignments
-        const deptIds = [...new Set(assignments.map(a => a.department_id[0]).filter(id => id))];
-        this.state.departments = await this.orm.searchRead(
-            "hr.department",
-            [["id", "in", deptIds]],
-            ["name"]
-        );
-        
-        this.state.allAssignments = assignments;
-        this.setupCommonData(assignments);
-    }
-
-    setupCommonData(assignments) {
-        // Map department and division to picData
-        this.state.picData.forEach(pic => {
-            const assignment = assignments.find(a => a.user_id[0] === pic.user_id[0]);
-            pic.department_name = assignment && assignment.department_id ? assignment.department_id[1] : '-';
-            pic.division_name = assignment && assignment.division_id ? assignment.division_id[1] : '-';
-        });
-
-        this.state.filteredPicData = [...this.state.picData];
-
-        // Calculate total stats for BOD/Manager
-        this.calculateTotalStats();
-
-        // Calculate department stats
-        this.state.departments.forEach(dept => {
-            const deptUsers = assignments.filter(a => a.department_id[0] === dept.id);
-            const deptPics = this.state.picData.filter(pic => pic.department_name === dept.name);
-            
-            dept.total_users = deptUsers.length;
-            dept.total_tasks = deptPics.reduce((sum, pic) => sum + pic.total_tasks, 0);
-        });
-
-        this.loadChartData();
-    }
-
-    async loadChartData() {
-        const reports = await this.orm.searchRead(
-            "peepl.weekly.report",
-            [],
-            ["pic_id"]
-        );
+        // Statistics, departments, divisions and chart series aggregated server-side (record rules apply)
+        const data = await this.orm.call("peepl.pic.overview", "get_dashboard_data", []);
+        this.state.picData = data.pic_data;
+        this.state.filteredPicData = [...data.pic_data];
+        this.state.departments = data.departments;
+        this.state.divisions = data.divisions;
+        this.state.totalStats = data.total_stats;
 
         const chartData = {};
-        for (const dept of this.state.departments) {
-            const deptPics = this.state.picData.filter(pic => pic.department_name === dept.name);
-            chartData[dept.id] = {
-                users: [],
-                tasks: []
-            };
-            
-            for (const pic of deptPics) {
-                const userReports = reports.filter(r => r.pic_id[0] === pic.user_id[0]);
-                chartData[dept.id].users.push(pic.user_id[1]);
-                chartData[dept.id].tasks.push(userReports.length);
-            }
+        for (const dept of data.departments) {
+            chartData[dept.id] = dept.chart;
         }
         this.state.chartData = chartData;
     }
@@ -301,36 +215,16 @@ export class PeeplDashboard extends Component {
     }
 
     get uniqueDepartments() {
-        // Get departments from assignments (already filtered by record rules)
-        const deptNames = [...new Set(this.state.allAssignments?.map(a => a.department_id?.[1]).filter(n => n))];
-        return deptNames.sort();
+        return this.state.departments.map(dept => dept.name);
     }
 
     get uniqueRoles() {
-        // Get all divisions from all assignments
-        const divisions = new Set();
-        
-        if (this.state.allAssignments) {
-            this.state.allAssignments.forEach(assignment => {
-                if (assignment.division_id) {
-                    divisions.add(assignment.division_id[1]);
-                }
-            });
-        }
-        
-        // Filter by selected department if any
+        // Divisions, restricted to the selected department if any
         const dept = this.state.filterDepartment;
-        if (dept) {
-            const filteredDivisions = new Set();
-            this.state.allAssignments.forEach(assignment => {
-                if (assignment.department_id && assignment.department_id[1] === dept && assignment.division_id) {
-                    filteredDivisions.add(assignment.division_id[1]);
-                }
-            });
-            return [...filteredDivisions].filter(d => d).sort();
-        }
-        
-        return [...divisions].filter(d => d).sort();
+        const divisions = (this.state.divisions || [])
+            .filter(division => !dept || division.department_name === dept)
+            .map(division => division.name);
+        return [...new Set(divisions)].sort();
     }
 
     get paginatedData() {
@@ -382,7 +276,7 @@ export class PeeplDashboard extends Component {
             "search_read",
             [[["pic_id", "in", userIds]]],
             {
-                fields: ["name", "pic_id", "project_task", "deadline", "status", "progress", "notes"],
+                fields: ["name", "pic_id", "project_task", "deadline", "effective_status", "progress", "notes"],
                 order: "name asc"
             }
         );
@@ -390,6 +284,7 @@ export class PeeplDashboard extends Component {
         // Process notes with file rendering and add sequential number per department
         reports.forEach((report, index) => {
             report.dept_number = index + 1;
+            report.status = report.effective_status;
             
             if (report.notes) {
                 report.notes_html = report.notes;
@@ -482,19 +377,6 @@ export class PeeplDashboard extends Component {
         this.state.deptDetailData = null;
     }
 
-    calculateTotalStats() {
-        // Calculate total stats from all visible PIC data
-        this.state.totalStats = {
-            total_tasks: this.state.picData.reduce((sum, pic) => sum + (pic.total_tasks || 0), 0),
-            completed: this.state.picData.reduce((sum, pic) => sum + (pic.completed || 0), 0),
-            in_progress: this.state.picData.reduce((sum, pic) => sum + (pic.in_progress || 0), 0),
-            not_started: this.state.picData.reduce((sum, pic) => sum + (pic.not_started || 0), 0),
-            delayed: this.state.picData.reduce((sum, pic) => sum + (pic.delayed || 0), 0),
-            plan: this.state.picData.reduce((sum, pic) => sum + (pic.plan || 0), 0),
-            overdue: this.state.picData.reduce((sum, pic) => sum + (pic.overdue || 0), 0)
-        };
-    }
-
     filterByStatus(status) {
         this.state.filterStatus = status;
         this.filterData();
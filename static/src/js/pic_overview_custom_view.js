@@ -29,6 +29,7 @@ class PicOverviewCustomView extends Component {
         });
         
         onWillStart(async () => {
+            this.overviewModel = await this.orm.call("peepl.pic.overview", "get_overview_model", []);
             await this.loadRecords();
         });
         
@@ -53,50 +54,34 @@ class PicOverviewCustomView extends Component {
                 domain.push(["department_id.name", "=", deptFilter]);
             }
             
-            const fields = [
-                "user_id", "department_id", "job_position", "total_tasks", 
-                "completed", "in_progress", "not_started", "delayed", 
-                "plan", "overdue", "avg_progress"
-            ];
+            // Seek from the last row of the previous page when known (same filters and sort)
+            const cursorKey = JSON.stringify([domain, this.state.sortField, this.state.sortOrder]);
+            if (cursorKey !== this.cursorKey) {
+                this.cursorKey = cursorKey;
+                this.pageAfter = {};
+            }
             
-            const records = await this.orm.searchRead(
+            const data = await this.orm.call(
                 "peepl.pic.overview",
-                domain,
-                fields,
-                { 
-                    order: `${this.state.sortField} ${this.state.sortOrder}`,
-                    limit: this.state.recordsPerPage,
-                    offset: (this.state.currentPage - 1) * this.state.recordsPerPage
+                "get_overview_page",
+                [domain, this.state.sortField, this.state.sortOrder, this.state.recordsPerPage],
+                {
+                    offset: (this.state.currentPage - 1) * this.state.recordsPerPage,
+                    after: this.pageAfter[this.state.currentPage] || null,
                 }
             );
+            const records = data.records;
+            const totalCount = data.total;
+            this.pageAfter[this.state.currentPage + 1] = data.next_after;
             
-            // Get total count for pagination
-            const totalCount = await this.orm.searchCount(
-                "peepl.pic.overview",
-                domain
-            );
-            
-            // Get ALL records for filter dropdowns (not just current page)
-            const allRecords = await this.orm.searchRead(
-                "peepl.pic.overview",
-                [],
-                ["user_id", "department_id"],
-                {}
+            // Distinct names and departments for filter dropdowns (cached server-side)
+            const facets = await this.orm.call(
+                this.overviewModel,
+                "get_facets",
+                [["user_id", "department_id"]]
             );
-            
-            // Extract unique names and departments for filter dropdowns
-            const uniqueNamesSet = new Set();
-            const uniqueDepartmentsSet = new Set();
-            allRecords.forEach(record => {
-                if (record.user_id && record.user_id[1]) {
-                    uniqueNamesSet.add(record.user_id[1]);
-                }
-                if (record.department_id && record.department_id[1]) {
-                    uniqueDepartmentsSet.add(record.department_id[1]);
-                }
-            });
-            this.state.uniqueNames = Array.from(uniqueNamesSet).sort();
-            this.state.uniqueDepartments = Array.from(uniqueDepartmentsSet).sort();
+            this.state.uniqueNames = facets.user_id.map(facet => facet.label);
+            this.state.uniqueDepartments = facets.department_id.map(facet => facet.label);
             
             this.state.records = records;
             this.state.totalRecords = totalCount;
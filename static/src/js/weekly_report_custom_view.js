@@ -51,78 +51,22 @@ class WeeklyReportCustomView extends Component {
                 this.state.visibleColumns = JSON.parse(savedColumns);
             }
             
-            // Load user department and role first
-            await this.loadUserDepartment();
-            await this.loadUserRole();
-            
             // Get department filter from URL params or context
             const urlParams = new URLSearchParams(window.location.search);
             const deptFromUrl = urlParams.get('dept_filter');
-            const deptNameFromUrl = urlParams.get('dept_name');
             const nameFilterFromUrl = urlParams.get('name_filter');
             
             // Use context values if available, otherwise use URL params
             const contextDeptId = this.props.action?.context?.dept_filter;
-            const contextDeptName = this.props.action?.context?.dept_name;
-            
-            let finalDeptId = contextDeptId || deptFromUrl;
-            let finalDeptName = contextDeptName || deptNameFromUrl;
+            const requestedDeptId = contextDeptId || deptFromUrl;
             
             // Set name filter from URL
             if (nameFilterFromUrl) {
                 this.state.searchTerm = nameFilterFromUrl;
             }
             
-            // Auto-redirect Manager/Supervisor/Staff to their department if no filter specified
-            if (!finalDeptId && this.userDepartmentId && (this.isManager || this.isSupervisor || this.isStaff)) {
-                finalDeptId = this.userDepartmentId;
-                // Get department name
-                try {
-                    const dept = await this.orm.searchRead(
-                        "hr.department",
-                        [["id", "=", this.userDepartmentId]],
-                        ["name"],
-                        { limit: 1 }
-                    );
-                    if (dept.length > 0) {
-                        finalDeptName = dept[0].name;
-                    }
-                } catch (error) {
-                    console.warn("Could not load department name:", error);
-                }
-                
-                // Redirect to department filtered URL
-                if (finalDeptId && finalDeptName) {
-                    const newUrl = new URL(window.location);
-                    newUrl.searchParams.set('dept_filter', finalDeptId);
-                    newUrl.searchParams.set('dept_name', finalDeptName);
-                    if (nameFilterFromUrl) {
-                        newUrl.searchParams.set('name_filter', nameFilterFromUrl);
-                    }
-                    window.location.href = newUrl.toString();
-                    return; // Stop execution, page will reload
-                }
-            }
-            
-            // Update URL and context with detected department
-            if (finalDeptId && finalDeptName) {
-                const url = new URL(window.location);
-                url.searchParams.set('dept_filter', finalDeptId);
-                url.searchParams.set('dept_name', finalDeptName);
-                if (nameFilterFromUrl) {
-                    url.searchParams.set('name_filter', nameFilterFromUrl);
-                }
-                window.history.replaceState({}, '', url);
-                
-                // Update context
-                if (this.props.action?.context) {
-                    this.props.action.context.dept_filter = parseInt(finalDeptId);
-                    this.props.action.context.dept_name = finalDeptName;
-                }
-            }
-            
-            await this.loadDynamicFields();
-            await this.loadRecords();
+            // Role, department, dynamic fields and first page in one round trip
+            await this.loadBootstrap(requestedDeptId ? parseInt(requestedDeptId) : false, nameFilterFromUrl);
         });
         
         onMounted(() => {
@@ -204,69 +148,54 @@ class WeeklyReportCustomView extends Component {
     }
     
 
-    async loadUserRole() {
+    async loadBootstrap(deptId, nameFilter) {
+        this.state.loading = true;
         try {
-            // Check user groups to determine role
-            const userGroups = await this.orm.call(
-                "res.users",
-                "has_group",
-                ["peepl_weekly_report.group_peepl_bod"]
+            const data = await this.orm.call(
+                "peepl.weekly.report",
+                "get_list_bootstrap",
+                [deptId || false, nameFilter || false, this.state.recordsPerPage]
             );
             
-            if (userGroups) {
-                this.isBOD = true;
-                return;
-            }
-            
-            const isManager = await this.orm.call(
-                "res.users",
-                "has_group",
-                ["peepl_weekly_report.group_peepl_manager"]
-            );
+            this.userDepartmentId = data.department_id;
+            this.isBOD = data.role === 'bod';
+            this.isManager = data.role === 'manager';
+            this.isSupervisor = data.role === 'supervisor';
+            this.isStaff = data.role === 'staff';
             
-            if (isManager) {
-                this.isManager = true;
-                return;
+            // Update URL and context with detected department (Manager/Supervisor/Staff default to their own)
+            if (data.dept_filter && data.dept_name) {
+                const url = new URL(window.location);
+                url.searchParams.set('dept_filter', data.dept_filter);
+                url.searchParams.set('dept_name', data.dept_name);
+                if (nameFilter) {
+                    url.searchParams.set('name_filter', nameFilter);
+                }
+                window.history.replaceState({}, '', url);
+                
+                if (this.props.action?.context) {
+                    this.props.action.context.dept_filter = data.dept_filter;
+                    this.props.action.context.dept_name = data.dept_name;
+                }
             }
             
-            const isSupervisor = await this.orm.call(
-                "res.users",
-                "has_group",
-                ["peepl_weekly_report.group_peepl_supervisor"]
-            );
+            this.cursorKey = JSON.stringify([this.departmentId, this.nameFilter]);
+            this.pageAfter = { 2: data.next_after };
             
-            if (isSupervisor) {
-                this.isSupervisor = true;
-                return;
-            }
-            
-            const isStaff = await this.orm.call(
-                "res.users",
-                "has_group",
-                ["peepl_weekly_report.group_peepl_staff"]
-            );
+            this.state.dynamicFields = data.dynamic_fields;
+            this.state.records = data.records;
+            this.state.totalRecords = data.total;
+            this.state.uniqueNames = data.unique_names;
             
-            if (isStaff) {
-                this.isStaff = true;
-            }
-        } catch (error) {
-            console.warn("Could not load user role:", error);
-        }
-    }
-    
-    async loadUserDepartment() {
-        try {
-            const currentUser = await this.orm.searchRead(
-                "peepl.user.assignment",
-                [["user_id", "=", this.env.user.userId], ["active", "=", true]],
-                ["department_id"],
-                { limit: 1 }
-            );
-            if (currentUser.length > 0 && currentUser[0].department_id) {
-                this.userDepartmentId = currentUser[0].department_id[0];
-            }
+            setTimeout(() => this.renderNotesContent(), 50);
+            setTimeout(() => this.injectDynamicColumns(), 100);
         } catch (error) {
-            console.warn("Could not load user department:", error);
+            console.error("Error loading weekly reports:", error);
+            this.state.dynamicFields = [];
+            this.state.records = [];
+            this.state.totalRecords = 0;
+        } finally {
+            this.state.loading = false;
         }
     }
     
@@ -317,136 +246,40 @@ class WeeklyReportCustomView extends Component {
         return null;
     }
     
-    get domain() {
-        let domain = [];
-        if (this.departmentId) {
-            domain.push(["department_id", "=", this.departmentId]);
-        }
-        
+    get nameFilter() {
         // Check URL params for filter
         const urlParams = new URLSearchParams(window.location.search);
-        const nameFilter = urlParams.get('name_filter') || this.state.searchTerm;
-        
-        if (nameFilter) {
-            domain.push(["pic_id.name", "=", nameFilter]);
-        }
-        
-        console.log("Search domain:", domain, "Name filter:", nameFilter);
-        return domain;
-    }
-    
-    async loadDynamicFields() {
-        try {
-            const deptId = this.departmentId;
-            console.log("loadDynamicFields - departmentId:", deptId);
-            console.log("loadDynamicFields - userDepartmentId:", this.userDepartmentId);
-            
-            if (deptId) {
-                const templates = await this.orm.searchRead(
-                    "peepl.field.template",
-                    [["department_id", "=", deptId], ["active", "=", true]],
-                    ["name", "field_type", "anchor_field", "position", "sequence"],
-                    { order: "sequence" }
-                );
-                console.log("loadDynamicFields - templates found:", templates);
-                
-                this.state.dynamicFields = templates.map(t => ({
-                    name: `x_field${t.id}_value`,
-                    label: t.name,
-                    type: t.field_type,
-                    anchor: t.anchor_field,
-                    position: t.position,
-                    sequence: t.sequence
-                }));
-                console.log("loadDynamicFields - dynamicFields:", this.state.dynamicFields);
-            } else {
-                console.log("loadDynamicFields - no deptId, setting empty array");
-                this.state.dynamicFields = [];
-            }
-        } catch (error) {
-            console.error("Error loading dynamic fields:", error);
-            this.state.dynamicFields = [];
-        }
+        return urlParams.get('name_filter') || this.state.searchTerm;
     }
     
     async loadRecords() {
         this.state.loading = true;
         try {
-            const domain = this.domain;
-            const context = {};
-            
-            if (this.departmentId) {
-                context.dept_filter = this.departmentId;
-            }
-            
-            // Load basic fields first
-            const basicFields = [
-                "display_number", "pic_id", 
-                "project_task", "deadline", "status", "progress", "notes", "department_id"
-            ];
-            
-            // Only add dynamic fields that actually exist
-            const availableFields = [...basicFields];
-            for (const field of this.state.dynamicFields) {
-                try {
-                    // Test if field exists by doing a small search
-                    await this.orm.searchRead(
-                        "peepl.weekly.report",
-                        [],
-                        [field.name],
-                        { limit: 1 }
-                    );
-                    availableFields.push(field.name);
-                } catch (error) {
-                    console.warn(`Field ${field.name} not available:`, error);
-                }
-            }
-            
-            const records = await this.orm.searchRead(
-                "peepl.weekly.report",
-                domain,
-                availableFields,
-                { 
-                    limit: this.state.recordsPerPage,
-                    offset: (this.state.currentPage - 1) * this.state.recordsPerPage,
-                    context 
-                }
-            );
-            
-            const totalCount = await this.orm.searchCount(
-                "peepl.weekly.report",
-                domain
-            );
-            
-            records.forEach((record, index) => {
-                record.display_number = (this.state.currentPage - 1) * this.state.recordsPerPage + index + 1;
-            });
-            
-            // Get ALL names from department for dropdown (not just filtered)
-            let allNamesDomain = [];
-            const urlParams = new URLSearchParams(window.location.search);
-            const deptFilter = urlParams.get('dept_filter');
-            if (deptFilter) {
-                allNamesDomain.push(["department_id", "=", parseInt(deptFilter)]);
+            // Seek from the last row of the previous page when known (same filters)
+            const cursorKey = JSON.stringify([this.departmentId, this.nameFilter]);
+            if (cursorKey !== this.cursorKey) {
+                this.cursorKey = cursorKey;
+                this.pageAfter = {};
             }
             
-            const allRecords = await this.orm.searchRead(
+            // Page rows, total, dynamic columns and PIC names in one round trip
+            const data = await this.orm.call(
                 "peepl.weekly.report",
-                allNamesDomain,
-                ["pic_id"],
-                {}
+                "get_list_page",
+                [
+                    this.departmentId || false,
+                    this.nameFilter || false,
+                    (this.state.currentPage - 1) * this.state.recordsPerPage,
+                    this.state.recordsPerPage,
+                    this.pageAfter[this.state.currentPage] || null,
+                ]
             );
+            this.pageAfter[this.state.currentPage + 1] = data.next_after;
             
-            const uniqueNamesSet = new Set();
-            allRecords.forEach(record => {
-                if (record.pic_id && record.pic_id[1]) {
-                    uniqueNamesSet.add(record.pic_id[1]);
-                }
-            });
-            this.state.uniqueNames = Array.from(uniqueNamesSet).sort();
-            
-            this.state.records = records;
-            this.state.totalRecords = totalCount;
+            this.state.dynamicFields = data.dynamic_fields;
+            this.state.uniqueNames = data.unique_names;
+            this.state.records = data.records;
+            this.state.totalRecords = data.total;
             
             setTimeout(() => this.renderNotesContent(), 50);
             setTimeout(() => this.injectDynamicColumns(), 100);